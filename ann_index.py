@@ -0,0 +1,149 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+class ExactIndex:
+    """Búsqueda exacta: todas las filas del catálogo son candidatas"""
+
+    def reset(self):
+        pass
+
+    def needs_training(self, size):
+        return False
+
+    def train(self, fetch_rows, size):
+        pass
+
+    def add(self, rows, fetch_rows):
+        pass
+
+    def candidates(self, query):
+        """None significa 'puntuar todo el catálogo'"""
+        return None
+
+class _RowList:
+    """Lista de filas que crece por duplicación sobre un arreglo de numpy"""
+
+    def __init__(self):
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.size = 0
+
+    def extend(self, rows):
+        end = self.size + len(rows)
+        if end > len(self.rows):
+            grown = np.zeros(max(end, len(self.rows) * 2, 16), dtype=np.int64)
+            grown[:self.size] = self.rows[:self.size]
+            self.rows = grown
+        self.rows[self.size:end] = rows
+        self.size = end
+
+    def view(self):
+        return self.rows[:self.size]
+
+class IVFIndex:
+    """Índice aproximado estilo IVF: cuantizador grueso + listas invertidas.
+
+    Los vectores normalizados se agrupan con k-means esférico en `n_lists`
+    centroides; cada fila queda en la lista de su centroide más cercano. Una
+    consulta solo puntúa las filas de los `n_probe` centroides más parecidos,
+    así que `n_probe` controla el compromiso entre recall y latencia.
+    Mientras el catálogo tenga menos de `min_size` juegos no se entrena y la
+    búsqueda sigue siendo exacta.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, min_size=5000, train_size=50000,
+                 iterations=10, batch_size=65536, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_size = min_size
+        self.train_size = train_size
+        self.iterations = iterations
+        self.batch_size = batch_size
+        self.seed = seed
+        self.centroids = None
+        self.lists = []
+
+    @property
+    def trained(self):
+        return self.centroids is not None
+
+    def reset(self):
+        """Descarta centroides y listas; se vuelve a entrenar con las filas que se agreguen"""
+        self.centroids = None
+        self.lists = []
+
+    def needs_training(self, size):
+        return not self.trained and size >= self.min_size
+
+    def _centroids_for(self, dim):
+        """Centroides extendidos con ceros para las columnas agregadas después del entrenamiento"""
+        if self.centroids.shape[1] < dim:
+            padding = np.zeros((len(self.centroids), dim - self.centroids.shape[1]), dtype=np.float32)
+            self.centroids = np.hstack([self.centroids, padding])
+        return self.centroids[:, :dim]
+
+    def _assign(self, vectors):
+        return np.argmax(vectors @ self._centroids_for(vectors.shape[1]).T, axis=1)
+
+    def train(self, fetch_rows, size):
+        """Entrena los centroides con k-means esférico e indexa las `size` filas actuales.
+
+        `fetch_rows(rows)` devuelve los vectores normalizados (densos) de esas filas;
+        el entrenamiento usa como máximo `train_size` filas de muestra.
+        """
+        rng = np.random.default_rng(self.seed)
+        if size > self.train_size:
+            sample = np.sort(rng.choice(size, self.train_size, replace=False))
+        else:
+            sample = np.arange(size)
+        vectors = fetch_rows(sample)
+        n_lists = self.n_lists or int(min(4096, max(1, np.sqrt(len(vectors)))))
+        n_lists = min(n_lists, len(vectors))
+
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            # Suma de los vectores de cada grupo con una matriz de pertenencia dispersa
+            membership = csr_matrix(
+                (np.ones(len(vectors), dtype=np.float32), (assignment, np.arange(len(vectors)))),
+                shape=(n_lists, len(vectors))
+            )
+            sums = np.asarray(membership @ vectors, dtype=np.float32)
+            norms = np.linalg.norm(sums, axis=1)
+            filled = norms > 0
+            centroids[filled] = sums[filled] / norms[filled, None]
+
+        self.centroids = centroids.astype(np.float32)
+        self.lists = [_RowList() for _ in range(n_lists)]
+        self.add(np.arange(size), fetch_rows)
+
+    def add(self, rows, fetch_rows):
+        """Asigna filas nuevas a sus listas invertidas (inserción incremental)"""
+        if not self.trained:
+            return
+        for start in range(0, len(rows), self.batch_size):
+            batch_rows = rows[start:start + self.batch_size]
+            assignment = self._assign(fetch_rows(batch_rows))
+            order = np.argsort(assignment, kind="stable")
+            groups, bounds = np.unique(assignment[order], return_index=True)
+            for group, begin, end in zip(groups, bounds, list(bounds[1:]) + [len(order)]):
+                self.lists[group].extend(batch_rows[order[begin:end]])
+
+    def candidates(self, query):
+        """Filas de las `n_probe` listas más cercanas a la consulta"""
+        if not self.trained:
+            return None
+        centroid_scores = self._centroids_for(len(query)) @ query
+        n_probe = min(self.n_probe, len(self.lists))
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        return np.concatenate([self.lists[probe].view() for probe in probes])
+
+ANN_INDEXES = {
+    "exact": ExactIndex,
+    "ivf": IVFIndex,
+}
+
+def create_ann_index(kind="exact", **options):
+    """Crea el índice de vecinos indicado ("exact" o "ivf")"""
+    if kind not in ANN_INDEXES:
+        raise ValueError(f"Índice de vecinos desconocido: {kind}")
+    return ANN_INDEXES[kind](**options)
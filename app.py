@@ -1,124 +1,125 @@
-import requests
 import streamlit as st
 import os
-import json
-import csv
 import re
 import time
 from dotenv import load_dotenv
-from transformers import MarianMTModel, MarianTokenizer
-import torch
-from PIL import Image, ImageEnhance, ImageFilter
+
+# Cargar las variables del archivo .env (antes de importar los módulos que leen
+# su configuración del entorno, como translator y translation_cache)
+load_dotenv()
+
 from io import BytesIO
-import spacy
 from itertools import combinations
 from responses import generate_game_response, generate_no_results_response, generate_end_conversation_response
-import html
-from game_recommender import GameRecommender
-
-nlp = spacy.load("es_core_news_sm")
-
-# Cargar las variables del archivo .env
-load_dotenv()
+from game_recommender import UserProfile
+from translator import translate_paragraphs, iter_translated_paragraphs, translation_cache_for
+from resources import get_resource, warm_up
+from query_parser import normalize_query, query_words
+from rawg_client import RAWGError
+from ocr_client import OCRError
+from image_preprocessing import preprocess_image
+from tracing import span, traced, tracer
+
+# Cargar los recursos pesados (tokenizador de consultas, MarianMT y caché de traducciones)
+# una sola vez por proceso; en los reruns y en las demás sesiones solo se reutilizan
+resource_load_times = warm_up()
 
 # Obtener la clave de API de RAWG
 RAWG_API_KEY = os.getenv("RAWG_API_KEY")
-OCR_API_KEYS = os.getenv("OCR_API_KEYS", "").split(",")
-OCR_API_KEYS = [key.strip() for key in OCR_API_KEYS if key.strip()]
 
-# Cache para almacenar las últimas búsquedas y el recomendador
+# Perfil de decodificación de las traducciones interactivas (ver translator.DECODING_PROFILES)
+INTERACTIVE_PROFILE = os.getenv("INTERACTIVE_DECODING_PROFILE", "fast")
+
+# Pedir en paralelo los detalles de todos los resultados de la búsqueda, no solo del primero
+FETCH_ALL_HITS = os.getenv("FETCH_ALL_HITS", "0") == "1"
+
+# Mostrar los datos del juego en cuanto llegan y traducir la descripción mientras se muestra
+STREAM_DESCRIPTIONS = os.getenv("STREAM_DESCRIPTIONS", "1") != "0"
+
+# Panel de latencias por etapa en la barra lateral (solo con TRACING=1)
+TRACE_PANEL = os.getenv("TRACE_PANEL", "1") != "0"
+
+# Cache para almacenar las últimas búsquedas y el perfil de la sesión
 if 'last_searches' not in st.session_state:
     st.session_state.last_searches = []
 
-if 'recommender' not in st.session_state:
-    st.session_state.recommender = GameRecommender()
+if 'profile' not in st.session_state:
+    st.session_state.profile = UserProfile()
 
-# Configurar el modelo de traducción MarianMT
-model_name = "Helsinki-NLP/opus-mt-en-es"
-model_path = "models/marianmt"
+# Catálogo del recomendador compartido por todas las sesiones: lo que busca
+# cualquier usuario queda disponible para los demás; cada sesión solo guarda su perfil
+recommender = get_resource("recommender")
 
-def load_model():
-    """Cargar o descargar el modelo MarianMT."""
-    try:
-        # Intentar cargar el modelo localmente
-        tokenizer = MarianTokenizer.from_pretrained(model_path)
-        model = MarianMTModel.from_pretrained(model_path)
-        return tokenizer, model
-    except:
-        # Si no existe localmente, descargarlo y guardarlo
-        tokenizer = MarianTokenizer.from_pretrained(model_name)
-        model = MarianMTModel.from_pretrained(model_name)
-        
-        # Guardar el modelo y el tokenizador
-        tokenizer.save_pretrained(model_path)
-        model.save_pretrained(model_path)
-        
-        return tokenizer, model
+# Modelo de traducción y caché de traducciones (SQLite por defecto; importa
+# cache/translations.json la primera vez), compartidos por todas las sesiones
+tokenizer, model = get_resource("translation_model")
+translation_cache = get_resource("translation_cache")
 
-# Cargar el modelo al inicio
-tokenizer, model = load_model()
+# Textos completos traducidos con el perfil interactivo (claves separadas de las de otros perfiles)
+interactive_cache = translation_cache_for(translation_cache, model, INTERACTIVE_PROFILE)
 
-# Crear la carpeta 'cache' si no existe
-if not os.path.exists("cache"):
-    os.makedirs("cache")
+# Cliente de OCR.space con las claves de OCR_API_KEYS y el estado de cada una,
+# compartido por todas las sesiones
+ocr_client = get_resource("ocr_client")
 
-# Función para cargar o inicializar el caché
-def load_cache():
-    """Cargar el caché de traducciones desde un archivo."""
-    cache_file = "cache/translations.json"
-    if os.path.exists(cache_file):
-        try:
-            with open(cache_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return {}
-    return {}
-
-# Función para guardar el caché
-def save_cache(cache):
-    """Guardar el caché de traducciones en un archivo."""
-    cache_file = "cache/translations.json"
+# Almacén de juegos guardados (importa data/game_info.json y data/game_info.csv la primera vez)
+game_store = get_resource("game_store")
+
+# Índice de títulos del almacén para responder sin RAWG (tolera errores de escritura)
+title_index = get_resource("title_index")
+
+@traced("translate.text")
+def translate_full_text(text):
+    """Traduce el texto del inglés al español usando MarianMT (los errores se propagan)."""
+    # Verificar si la traducción completa ya está en caché
+    cached = interactive_cache.get(text)
+    if cached is not None:
+        return cached
+        
+    # Traducir los párrafos en lotes; los párrafos ya conocidos salen del caché
+    translated_text = translate_paragraphs(text, tokenizer, model, cache=translation_cache,
+                                           profile=INTERACTIVE_PROFILE)
+    
+    # Guardar en caché
+    interactive_cache.set(text, translated_text)
+    
+    return translated_text
+
+def translate_text(text):
+    """Traduce el texto del inglés al español; si falla devuelve el original."""
     try:
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, ensure_ascii=False, indent=4)
+        return translate_full_text(text)
     except Exception as e:
-        st.error(f"Error al guardar el caché: {e}")
+        st.error(f"Error al traducir el texto: {e}")
+        return text
 
-# Cargar el caché al inicio
-cache = load_cache()
+def translate_text_stream(text, status=None):
+    """Generador con la traducción línea a línea; al terminar guarda el texto completo en caché.
 
-def translate_text(text):
-    """Traduce el texto del inglés al español usando MarianMT."""
+    Si se pasa `status`, status["complete"] queda en True solo cuando se tradujo todo el texto.
+    """
+    lines = []
     try:
-        # Verificar si la traducción ya está en caché
-        if text in cache:
-            return cache[text]
-            
-        # Dividir el texto en párrafos usando los saltos de línea
-        paragraphs = text.split('\n')
-        translated_paragraphs = []
+        cached = interactive_cache.get(text)
+        if cached is not None:
+            yield from cached.split('\n')
+            if status is not None:
+                status["complete"] = True
+            return
         
-        # Traducir cada párrafo por separado
-        for paragraph in paragraphs:
-            if paragraph.strip():  # Solo traducir si el párrafo no está vacío
-                inputs = tokenizer(paragraph, return_tensors="pt", padding=True)
-                translated = model.generate(**inputs)
-                translated_paragraph = tokenizer.decode(translated[0], skip_special_tokens=True)
-                translated_paragraphs.append(translated_paragraph)
-            else:
-                translated_paragraphs.append('')  # Mantener los saltos de línea vacíos
-        
-        # Unir los párrafos traducidos con saltos de línea
-        translated_text = '\n'.join(translated_paragraphs)
+        for line in iter_translated_paragraphs(text, tokenizer, model, cache=translation_cache,
+                                               profile=INTERACTIVE_PROFILE):
+            lines.append(line)
+            yield line
         
         # Guardar en caché
-        cache[text] = translated_text
-        save_cache(cache)
-        
-        return translated_text
+        interactive_cache.set(text, '\n'.join(lines))
+        if status is not None:
+            status["complete"] = True
     except Exception as e:
         st.error(f"Error al traducir el texto: {e}")
-        return text
+        # Mostrar el resto del texto sin traducir
+        yield from text.split('\n')[len(lines):]
 
 # Crear la carpeta 'data' si no existe
 if not os.path.exists("data"):
@@ -137,80 +138,28 @@ def typewriter_effect(text, delay=0.01):
 # Función para mejorar la imagen antes de enviarla al OCR
 def enhance_image(image_bytes):
     try:
-        with Image.open(image_bytes) as img:
-            # Convertir a escala de grises
-            img = img.convert("L")
-            
-            # Mejorar el contraste
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(2.0)  # Aumentar el contraste
-
-            # Mejorar el brillo
-            brightness = ImageEnhance.Brightness(img)
-            img = brightness.enhance(1.5)  # Aumentar el brillo
-
-            # Reducir el ruido
-            img = img.filter(ImageFilter.MedianFilter(size=3))
-
-            # Guardar la imagen procesada en BytesIO
-            enhanced_bytes = BytesIO()
-            img.save(enhanced_bytes, format="JPEG")
-            enhanced_bytes.seek(0)
-            return enhanced_bytes
+        # Reducir a una resolución legible, realzar y comprimir (ver image_preprocessing.py)
+        data, metrics = preprocess_image(image_bytes.getvalue())
+        st.session_state.last_image_metrics = metrics
+        return BytesIO(data)
     except Exception as e:
         st.error(f"Error al procesar la imagen: {e}")
         return None
 
-def extract_text_ocr_space(image_bytes):
-    enhanced_bytes = enhance_image(image_bytes)
-    if not enhanced_bytes:
-        return "No se pudo procesar la imagen."
-
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    for api_key in OCR_API_KEYS:  # Intentar con cada API Key
-        for language in ["spa", "eng"]:  # Primero español, luego inglés
-            response = requests.post(
-                "https://api.ocr.space/parse/image",
-                files={"image": enhanced_bytes},
-                data={
-                    "apikey": api_key,
-                    "language": language,
-                    "isOverlayRequired": False,
-                    "filetype": "JPG",
-                    "OCREngine": 2
-                },
-                headers=headers
-            )
-
-            if response.status_code != 200:
-                print(f"Error en la API (HTTP {response.status_code}): {response.text}")
-                continue  # Intentar con la siguiente clave API
+def prepare_ocr_image(image_data):
+    """Bytes de la imagen mejorada que se envían al OCR (None si no se pudo procesar)"""
+    enhanced_bytes = enhance_image(BytesIO(image_data))
+    return enhanced_bytes.getvalue() if enhanced_bytes else None
 
-            try:
-                result = response.json()
-                if isinstance(result, str):  # Si `result` es una cadena, convertirla a diccionario
-                    result = eval(result)
-            except (ValueError, SyntaxError):
-                st.error(f"Respuesta no válida de OCR.space: {response.text}")
-                continue
-
-            if isinstance(result, dict) and "ParsedResults" in result:
-                parsed_results = result["ParsedResults"]
-                if parsed_results and isinstance(parsed_results, list):
-                    extracted_text = parsed_results[0].get("ParsedText", "").replace("\n", " ")
-                    return extracted_text if extracted_text else "No se detectó texto en la imagen."
-                else:
-                    st.error("No se pudieron extraer resultados válidos del OCR")
-                    return "No se detectó texto en la imagen."
-            else:
-                st.error(f"Error al procesar la respuesta de OCR.space: {result}")
-                return "No se detectó texto en la imagen."
-
-        print(f"La clave API {api_key[:5]}... falló o alcanzó su límite.")  # Mostrar solo parte de la clave
-
-    st.error("Todas las claves API fallaron o se agotaron.")
-    return "No se detectó texto en la imagen."
+@traced("ocr.total")
+def extract_text_ocr_space(image_bytes):
+    # Caché por contenido, idiomas en paralelo y claves agotadas saltadas (ver ocr_client.py)
+    try:
+        extracted_text = ocr_client.extract_text(image_bytes.getvalue(), preprocess=prepare_ocr_image)
+    except OCRError as e:
+        st.error(str(e))
+        return "No se detectó texto en la imagen."
+    return extracted_text if extracted_text else "No se detectó texto en la imagen."
 
 # Función para extraer el nombre del juego y otros detalles en lenguaje natural
 def extract_game_name(user_input):
@@ -236,16 +185,6 @@ def extract_game_name(user_input):
 
 def interpret_query(user_query):
 
-    # Si user_query es una tupla, convertirla en una cadena
-    if isinstance(user_query, tuple):
-        user_query = " ".join(user_query)
-    
-    # Asegurarse de que user_query sea una cadena y convertirla a minúsculas
-    user_query = str(user_query).lower()
-
-    # Procesar el texto con spaCy
-    doc = nlp(user_query)
-
     # Lista de palabras clave para género y plataforma
     genre_keywords = ["acción", "aventura", "estrategia", "rpg", "deportes", "carreras", "simulación", "misterio", "terror", "plataformas"]
     platform_keywords = [
@@ -256,14 +195,11 @@ def interpret_query(user_query):
         "xbox series x|s"
     ]
 
-    # Palabras que no aportan valor para los filtros (palabras basura)
-    stop_words = {"todos", "juegos", "dame", "quiero", "información", "podrías", "darme", "consultar", "de", "en", "sobre", "para", "con", "y", "la", "el", "los", "las", "un", "una", "que", "quisiera", "saber", "quiero", "hablame", "acerca", "del", "alrededor", "acerca"}
-
     # Inicializar el diccionario de filtros
     filters = {}
 
-    # Filtrar las palabras relevantes (eliminamos las palabras vacías y de puntuación)
-    filtered_words = [token.text for token in doc if token.text not in stop_words and not token.is_punct]
+    # Palabras relevantes de la consulta (sin palabras vacías ni puntuación)
+    filtered_words = query_words(user_query)
 
     # Buscar las palabras clave de género y plataforma
     for word in filtered_words:
@@ -288,25 +224,27 @@ def interpret_query(user_query):
     
     return filters
 
-def word_filter(user_query):
-
-    # Si user_query es una tupla, convertirla en una cadena
-    if isinstance(user_query, tuple):
-        user_query = " ".join(user_query)
-    
-    # Asegurarse de que user_query sea una cadena y convertirla a minúsculas
-    user_query = str(user_query).lower()
-
-    # Procesar el texto con spaCy
-    doc = nlp(user_query)
+def find_catalog_games(user_query, limit=10):
+    """Juegos del catálogo local para consultas solo de categoría (género, plataforma y/o año)"""
+    filters = interpret_query(user_query)
+    facets = {filters.get("genre"), filters.get("platform"), filters.get("release_year")} - {None}
+    # Si queda alguna palabra que no es un filtro, la consulta es un título y se busca en RAWG
+    if not facets or not set(query_words(user_query)) <= facets:
+        return []
+    return recommender.find_games(
+        filters.get("genre"), filters.get("platform"), filters.get("release_year"), limit=limit
+    )
+
+def show_catalog_games(games):
+    st.success(f"Encontré {len(games)} juegos en el catálogo:")
+    for game in games:
+        st.write(f"🎮 **{game['name']}** ({game['released']}) ⭐ {game['rating']}/5")
+        st.write(f"   Géneros: {', '.join(game['genres'])} | Plataformas: {', '.join(game['platforms'])}")
 
-    # Palabras que no aportan valor para los filtros (palabras basura)
-    stop_words = {"todos", "juegos", "dame", "quiero", "información", "podrías", "darme", "consultar", "de", "en", "sobre", "para", "con", "y", "la", "el", "los", "las", "un", "una", "que", "quisiera", "saber", "quiero", "hablame", "acerca", "del", "alrededor", "acerca"}
+def word_filter(user_query):
 
-    # Filtrar las palabras relevantes (eliminamos las palabras vacías y de puntuación)
-    filtered_words = " ".join(token.text for token in doc if token.text not in stop_words and not token.is_punct)
-    
-    return filtered_words
+    # Palabras relevantes de la consulta (sin palabras vacías ni puntuación)
+    return " ".join(query_words(user_query))
 
 def build_api_url(filters, api_key):
     base_url = f"https://api.rawg.io/api/games"
@@ -328,160 +266,83 @@ def build_api_url(filters, api_key):
 
     return base_url
 
-def save_game_info_csv(game):
-    print(f"Tipo de 'game': {type(game)}")
-    print(f"Contenido de 'game': {game}")
-    # Verificar si 'game' es un diccionario o una lista de diccionarios
-    if isinstance(game, dict):
-        game_data = game  # Si es un diccionario, usarlo directamente
-    elif isinstance(game, list) and len(game) > 0 and isinstance(game[0], dict):
-        game_data = game[0]  # Si es una lista de diccionarios, tomar el primer diccionario
-    else:
-        raise TypeError(f"Se esperaba un diccionario o una lista de diccionarios, pero se recibió {type(game)}")
-
-    # Definir las cabeceras que deben ser las mismas para todos los registros
-    header = ['name', 'description', 'release_date', 'platforms']
-    
-    # Verificación segura de la lista 'platforms'
-    platforms = game_data.get('platforms', [])
-    if not isinstance(platforms, list):
-        platforms = []  # Si 'platforms' no es una lista, se asigna una lista vacía
-
-    # Crear el diccionario con los datos que se escribirán en el archivo CSV
-    row = {
-        'name': game_data.get('name', 'Nombre no disponible'),
-        'description': game_data.get('description', 'Descripción no disponible'),
-        'release_date': game_data.get('released', 'No disponible'),
-        'platforms': ', '.join([platform.get('platform', {}).get('name', 'Desconocida') for platform in platforms if isinstance(platform, dict)])
-    }
-
-    # Ruta del archivo donde se guardarán los datos
-    file_path = 'data/game_info.csv'
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)  # Crear directorio si no existe
-
-    # Comprobar si el archivo ya existe y tiene contenido
-    file_exists = os.path.isfile(file_path) and os.path.getsize(file_path) > 0
-
-    # Abrir el archivo en modo append ('a') para agregar nuevos registros
-    with open(file_path, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=header)
-        
-        # Escribir el encabezado solo si el archivo no existe o está vacío
-        if not file_exists:
-            writer.writeheader()
-        
-        # Escribir la fila con los datos del juego
-        writer.writerow(row)
-
-    return file_path  # Retornar la ruta del archivo guardado (opcional)
-
-def save_game_info_json(data):
-    file_path = 'data/game_info.json'
-
-    # Crear directorio si no existe
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-
-    # Si el archivo no existe o está vacío, crear uno nuevo con el contenido
-    if not os.path.isfile(file_path) or os.path.getsize(file_path) == 0:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=4)
-    else:
-        # Leer el archivo existente y agregar los nuevos datos
-        try:
-            with open(file_path, 'r+', encoding='utf-8') as file:
-                try:
-                    existing_data = json.load(file)
-                except json.JSONDecodeError:
-                    existing_data = []  # Si el archivo está vacío o corrupto, iniciar una lista vacía
-
-                # Agregar los nuevos datos a la lista existente
-                existing_data.extend(data)
-
-                # Volver a escribir el archivo con los datos actualizados
-                file.seek(0)
-                json.dump(existing_data, file, ensure_ascii=False, indent=4)
-        except Exception as e:
-            print(f"Error al procesar el archivo JSON: {e}")
-
-def get_game_info(user_input):
+def fetch_game_details(user_input):
     """
-    Obtiene la información del juego desde RAWG.io API
+    Obtiene la información del juego desde RAWG.io API con la descripción sin traducir
     """
     user_input_filter = word_filter(user_input)
+    # Búsqueda y detalles pasan por el caché de respuestas de RAWG (con TTL)
+    rawg = get_resource("rawg_lookup")
     try:
-        # URL base de la API de RAWG
-        search_url = "https://api.rawg.io/api/games"
-        
-        # Parámetros de búsqueda
-        params = {
-            "key": RAWG_API_KEY,
-            "search": user_input_filter,
-            "page_size": 5
-        }
-        
-        # Realizar la búsqueda
-        response = requests.get(search_url, params=params)
+        # Realizar la búsqueda (conexión persistente, timeouts y reintentos en RAWGClient)
+        try:
+            with span("rawg.search"):
+                game_ids = rawg.find_game_ids(normalize_query(user_input_filter))
+        except RAWGError as e:
+            st.error(f"Error en la búsqueda: {e.status_code or e}")
+            return None
         
-        if response.status_code == 200:
-            data = response.json()
+        if game_ids:
+            # Obtener detalles completos del juego usando su ID (descripción limpia, sin traducir);
+            # con FETCH_ALL_HITS se piden en paralelo los detalles de todos los resultados
+            try:
+                with span("rawg.details"):
+                    game_info, alternatives = rawg.game_details_many(game_ids if FETCH_ALL_HITS else game_ids[:1])
+            except RAWGError as e:
+                st.error(f"Error al obtener los detalles del juego: {e.status_code or e}")
+                return None
             
-            if data["count"] > 0:
-                game = data["results"][0]  # Tomamos el primer resultado
-                
-                # Obtener detalles completos del juego usando su ID
-                game_id = game["id"]
-                details_url = f"https://api.rawg.io/api/games/{game_id}"
-                details_params = {
-                    "key": RAWG_API_KEY
-                }
-                details_response = requests.get(details_url, params=details_params)
-                
-                if details_response.status_code == 200:
-                    game_details = details_response.json()
-                    
-                    # Limpiar la descripción de etiquetas HTML
-                    description = game_details.get("description", "No hay descripción disponible.")
-                    description = re.sub(r'<br\s*/?>|<p>|</p>', '\n', description)  # Reemplazar <br/>, <p> con saltos de línea
-                    description = re.sub(r'<[^>]+>', '', description)  # Eliminar otras etiquetas HTML
-                    description = html.unescape(description)  # Convertir entidades HTML
-                    description = re.sub(r'\n\s*\n', '\n\n', description)  # Eliminar líneas vacías múltiples
-                    description = description.strip()  # Eliminar espacios en blanco al inicio y final
-                    
-                    # Traducir el texto usando MarianMT
-                    translated_description = translate_text(description)
-                    
-                    # Preparar los datos del juego
-                    game_info = {
-                        "id": game_id,
-                        "name": game_details.get("name", "Nombre no disponible"),
-                        "description": translated_description,  # Usar la descripción traducida
-                        "rating": game_details.get("rating", 0),
-                        "rating_count": game_details.get("ratings_count", 0),
-                        "released": game_details.get("released", "Fecha no disponible"),
-                        "platforms": [p["platform"]["name"] for p in game_details.get("platforms", [])],
-                        "genres": [g["name"] for g in game_details.get("genres", [])],
-                        "developers": [d["name"] for d in game_details.get("developers", [])],
-                        "publishers": [p["name"] for p in game_details.get("publishers", [])],
-                        "background_image": game_details.get("background_image", ""),
-                        "metacritic": game_details.get("metacritic", None),
-                        "esrb_rating": game_details.get("esrb_rating", {}).get("name", None)
-                    }
-                    
-                    # Guardar la información del juego
-                    save_game_info_json([game_info])
-                    save_game_info_csv(game_info)
-                    
-                    return game_info
-                else:
-                    st.error(f"Error al obtener los detalles del juego: {details_response.status_code}")
-            else:
-                st.error("No se encontraron juegos con ese nombre.")
+            # Los demás resultados alimentan el catálogo del recomendador y el "¿quisiste decir?"
+            st.session_state.did_you_mean = [game["name"] for game in alternatives]
+            if alternatives:
+                recommender.update_model(alternatives)
+            return game_info
         else:
-            st.error(f"Error en la búsqueda: {response.status_code}")
+            st.error("No se encontraron juegos con ese nombre.")
     except Exception as e:
         st.error(f"Error al obtener la información del juego: {str(e)}")
     return None
 
+@traced("store.save")
+def save_game_info(game_info):
+    """Guarda la información del juego (con la descripción ya traducida)"""
+    # Upsert por id de RAWG en el almacén compartido (sin duplicados ni reescribir el archivo)
+    game_store.upsert(game_info)
+    title_index.add(game_info)
+
+@traced("lookup.local_match")
+def find_local_game(user_input):
+    """Juego ya guardado cuyo título coincide con la consulta (None si la confianza es baja)"""
+    # Se prueba la consulta completa y sin palabras vacías; gana la de mayor confianza
+    queries = {normalize_query(user_input), word_filter(user_input)}
+    matches = [match for match in map(title_index.best_match, queries) if match]
+    if not matches:
+        return None
+    return game_store.get(max(matches, key=lambda match: match["confidence"])["id"])
+
+@traced("lookup.get_game_info")
+def get_game_info(user_input):
+    """
+    Obtiene la información del juego desde el almacén local o desde RAWG.io API con la descripción traducida
+    """
+    # Los títulos que ya están guardados (aunque vengan con errores) no salen a RAWG
+    game_info = find_local_game(user_input)
+    if game_info:
+        return game_info
+    game_info = fetch_game_details(user_input)
+    if game_info:
+        # Traducir el texto usando MarianMT
+        try:
+            game_info["description"] = translate_full_text(game_info["description"])
+        except Exception as e:
+            # Sin traducción no se guarda: la próxima búsqueda vuelve a RAWG y al traductor
+            st.error(f"Error al traducir el texto: {e}")
+            return game_info
+        
+        # Guardar la información del juego
+        save_game_info(game_info)
+    return game_info
+
 def show_recommendations():
     """Muestra las recomendaciones en la barra lateral"""
     if st.session_state.last_searches:
@@ -490,14 +351,37 @@ def show_recommendations():
             st.sidebar.write(f"- {game['name']}")
         
         st.sidebar.markdown("### Recomendaciones")
-        recommendations = st.session_state.recommender.get_recommendations(st.session_state.last_searches)
+        recommendations = recommender.recommend(st.session_state.profile)
         
         if recommendations:
             for game in recommendations:
                 st.sidebar.write(f"- {game['name']} ({game['similarity']} similar)")
                 st.sidebar.write(f"  Géneros: {', '.join(game['genres'])}")
 
-def display_game_info(game_info):
+def show_trace_panel():
+    """Latencias por etapa (p50/p95/p99) acumuladas en este proceso"""
+    with st.sidebar.expander("⏱️ Latencias por etapa"):
+        report = tracer.report()
+        if not report:
+            st.caption("Todavía no hay mediciones.")
+        else:
+            st.table([
+                {
+                    "etapa": name,
+                    "n": stats["count"],
+                    "errores": stats["errors"],
+                    "p50 ms": round(stats["p50_ms"], 1),
+                    "p95 ms": round(stats["p95_ms"], 1),
+                    "p99 ms": round(stats["p99_ms"], 1),
+                }
+                for name, stats in report.items()
+            ])
+        if st.session_state.get("last_lookup_timings"):
+            st.caption(", ".join(f"{name}: {ms:.0f} ms" for name, ms in st.session_state.last_lookup_timings.items()))
+        if st.button("Reiniciar mediciones"):
+            tracer.reset()
+
+def display_game_info(game_info, description_stream=None):
     # Mostrar imagen del juego
     if game_info["background_image"]:
         st.image(game_info["background_image"], caption=game_info["name"])
@@ -521,7 +405,16 @@ def display_game_info(game_info):
     
     # Descripción
     st.subheader("Descripción")
-    st.markdown(game_info["description"])
+    if description_stream is None:
+        st.markdown(game_info["description"])
+    else:
+        # Completar la descripción a medida que se traducen los párrafos
+        placeholder = st.empty()
+        lines = []
+        for line in description_stream:
+            lines.append(line)
+            placeholder.markdown('\n'.join(lines))
+        game_info["description"] = '\n'.join(lines)
     
     # Recomendaciones basadas en géneros similares
     if len(st.session_state.last_searches) >= 3:
@@ -535,6 +428,50 @@ def display_game_info(game_info):
         if most_common_genres:
             st.write(f"Basado en tus búsquedas, te gustan los juegos de {', '.join([g[0] for g in most_common_genres])}.")
 
+def show_did_you_mean():
+    """Muestra los otros resultados de la búsqueda (modo FETCH_ALL_HITS)"""
+    if st.session_state.get("did_you_mean"):
+        st.caption(f"¿Quisiste decir...? {', '.join(st.session_state.did_you_mean)}")
+
+@traced("lookup.total")
+def search_and_display(user_query):
+    """Busca el juego y lo muestra; en modo streaming la descripción se traduce mientras se muestra"""
+    start = time.perf_counter()
+    timings = {}
+    
+    def timed_stream(stream):
+        # El primer párrafo se pide justo después de mostrar los datos del juego
+        timings["first_paint_ms"] = (time.perf_counter() - start) * 1000.0
+        yield from stream
+    
+    local_game = find_local_game(user_query)
+    if local_game:
+        st.session_state.did_you_mean = []
+    if STREAM_DESCRIPTIONS and not local_game:
+        game_info = fetch_game_details(user_query)
+        if game_info:
+            st.success(generate_game_response(game_info["name"]))
+            show_did_you_mean()
+            translation = {}
+            display_game_info(game_info, timed_stream(translate_text_stream(game_info["description"], translation)))
+            
+            # Guardar la información del juego solo si la descripción se tradujo completa
+            if translation.get("complete"):
+                save_game_info(game_info)
+    else:
+        # El juego local ya tiene la descripción traducida
+        game_info = local_game or get_game_info(user_query)
+        if game_info:
+            st.success(generate_game_response(game_info["name"]))
+            show_did_you_mean()
+            timings["first_paint_ms"] = (time.perf_counter() - start) * 1000.0
+            display_game_info(game_info)
+    
+    if game_info:
+        timings["total_ms"] = (time.perf_counter() - start) * 1000.0
+        st.session_state.last_lookup_timings = timings
+    return game_info
+
 def main():
     st.title("🎮 Asistente de Juegos")
     st.write("¡Hola! Soy tu asistente para encontrar información sobre juegos. Puedes preguntarme sobre cualquier juego.")
@@ -542,8 +479,8 @@ def main():
     # Inicializar el estado de la sesión
     if 'last_searches' not in st.session_state:
         st.session_state.last_searches = []
-    if 'recommender' not in st.session_state:
-        st.session_state.recommender = GameRecommender()
+    if 'profile' not in st.session_state:
+        st.session_state.profile = UserProfile()
     
     # Sidebar para mostrar recomendaciones y búsquedas recientes
     with st.sidebar:
@@ -554,11 +491,10 @@ def main():
                 st.write(f"🎮 {game['name']}")
             
             # Actualizar modelo y mostrar recomendaciones
-            if len(st.session_state.last_searches) >= 2:
+            if len(st.session_state.profile) >= recommender.min_recent_games:
                 st.subheader("🎮 Juegos Recomendados")
-                # Actualizar el modelo con todas las búsquedas
-                st.session_state.recommender.update_model(st.session_state.last_searches)
-                recommendations = st.session_state.recommender.get_recommendations(st.session_state.last_searches)
+                # Los juegos buscados ya están en el catálogo y en el perfil de la sesión
+                recommendations = recommender.recommend(st.session_state.profile)
                 
                 if recommendations:
                     for game in recommendations:
@@ -580,45 +516,45 @@ def main():
                 image_bytes = BytesIO(uploaded_file.getbuffer())
                 extracted_text = extract_text_ocr_space(image_bytes)
                 if extracted_text.strip():
-                    game_info = get_game_info(extracted_text.strip())
+                    # Buscar y mostrar información del juego
+                    game_info = search_and_display(extracted_text.strip())
                     if game_info:
-                        st.success(generate_game_response(game_info["name"]))
-                        
-                        # Mostrar información del juego
-                        display_game_info(game_info)
-                        
                         # Actualizar últimas búsquedas
                         if not any(game['name'] == game_info['name'] for game in st.session_state.last_searches):
                             st.session_state.last_searches.append(game_info)
                             if len(st.session_state.last_searches) > 3:
                                 st.session_state.last_searches.pop(0)
                             
-                            # Actualizar modelo inmediatamente
-                            st.session_state.recommender.update_model([game_info])
+                            # Agregar el juego al catálogo compartido y al perfil de la sesión
+                            recommender.observe(st.session_state.profile, [game_info])
                     else:
                         st.warning(generate_no_results_response())
                 else:
                     st.warning("No se pudo detectar texto en la imagen.")
                     st.write(generate_end_conversation_response())
         else:
-            game_info = get_game_info(user_input)
+            # Las consultas por categoría se responden con el catálogo local, sin llamar a RAWG
+            catalog_games = find_catalog_games(user_input)
+            if catalog_games:
+                show_catalog_games(catalog_games)
+            else:
+                # Buscar y mostrar información del juego
+                game_info = search_and_display(user_input)
             
-            if game_info:
-                st.success(generate_game_response(game_info["name"]))
-                
-                # Mostrar información del juego
-                display_game_info(game_info)
-                
-                # Actualizar últimas búsquedas
-                if not any(game['name'] == game_info['name'] for game in st.session_state.last_searches):
-                    st.session_state.last_searches.append(game_info)
-                    if len(st.session_state.last_searches) > 3:
-                        st.session_state.last_searches.pop(0)
+                if game_info:
+                    # Actualizar últimas búsquedas
+                    if not any(game['name'] == game_info['name'] for game in st.session_state.last_searches):
+                        st.session_state.last_searches.append(game_info)
+                        if len(st.session_state.last_searches) > 3:
+                            st.session_state.last_searches.pop(0)
                     
-                    # Actualizar modelo inmediatamente
-                    st.session_state.recommender.update_model([game_info])
-            else:
-                st.warning(generate_no_results_response())
+                        # Agregar el juego al catálogo compartido y al perfil de la sesión
+                        recommender.observe(st.session_state.profile, [game_info])
+                else:
+                    st.warning(generate_no_results_response())
+    
+    if tracer.enabled and TRACE_PANEL:
+        show_trace_panel()
 
 if __name__ == "__main__":
     main()
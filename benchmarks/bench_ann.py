@@ -0,0 +1,34 @@
+"""Mide recall@k y latencia del índice IVF frente a la búsqueda exacta.
+
+Uso: python -m benchmarks.bench_ann [tamaño] [n_probe ...]
+"""
+import sys
+import time
+
+from ann_index import IVFIndex
+from benchmarks.synthetic import generate_catalog
+from game_recommender import GameRecommender
+
+DEFAULT_SIZE = 100_000
+DEFAULT_PROBES = [1, 4, 8, 16, 32]
+QUERIES = 100
+K = 10
+
+def main(size, probes):
+    catalog = generate_catalog(size)
+    query_sets = [catalog[i * 3:i * 3 + 3] for i in range(QUERIES)]
+    print(f"Catálogo sintético de {size} juegos, recall@{K} sobre {QUERIES} consultas")
+    print(f"{'n_probe':>8} {'listas':>8} {'recall':>8} {'exacta ms':>10} {'IVF ms':>8} {'carga s':>8}")
+    for n_probe in probes:
+        recommender = GameRecommender(index=IVFIndex(n_probe=n_probe))
+        start = time.perf_counter()
+        recommender.update_model(catalog)
+        build_seconds = time.perf_counter() - start
+        stats = recommender.measure_recall(query_sets, k=K)
+        print(f"{n_probe:>8} {len(recommender.index.lists):>8} {stats['recall']:>8.3f} "
+              f"{stats['exact_ms']:>10.3f} {stats['approx_ms']:>8.3f} {build_seconds:>8.2f}")
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SIZE
+    probes = [int(probe) for probe in sys.argv[2:]] or DEFAULT_PROBES
+    main(size, probes)
@@ -0,0 +1,50 @@
+"""Compara los perfiles de decodificación de translator.DECODING_PROFILES.
+
+Para cada perfil traduce las mismas descripciones de cache/translations.json y
+reporta tokens de salida por segundo, latencia y BLEU/chrF contra las
+traducciones guardadas en ese caché y contra la salida del perfil "quality".
+
+Uso: python -m benchmarks.bench_decoding [descripciones] [perfil ...]
+"""
+import json
+import sys
+import time
+
+from benchmarks.metrics import corpus_bleu, corpus_chrf
+from translator import DECODING_PROFILES, load_model, translate_paragraphs
+
+CACHE_FILE = "cache/translations.json"
+DEFAULT_DESCRIPTIONS = 10
+
+def load_reference_pairs(count, path=CACHE_FILE):
+    """Las primeras `count` descripciones con su traducción guardada (siempre las mismas)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(json.load(f).items())[:count]
+
+def main(count, profiles):
+    pairs = load_reference_pairs(count)
+    sources = [source for source, _ in pairs]
+    references = [reference for _, reference in pairs]
+    tokenizer, model = load_model()
+    print(f"{len(pairs)} descripciones de {CACHE_FILE}")
+
+    outputs = {}
+    print(f"{'perfil':>8} {'ms/desc':>10} {'tokens/s':>10} {'BLEU caché':>11} {'chrF caché':>11} "
+          f"{'BLEU quality':>13} {'chrF quality':>13}")
+    # "quality" va primero porque es la referencia de los demás perfiles
+    for profile in sorted(profiles, key=lambda name: name != "quality"):
+        start = time.perf_counter()
+        outputs[profile] = [translate_paragraphs(text, tokenizer, model, profile=profile) for text in sources]
+        seconds = time.perf_counter() - start
+        tokens = sum(len(ids) for ids in tokenizer(text_target=outputs[profile])["input_ids"])
+
+        quality = outputs.get("quality", outputs[profile])
+        print(f"{profile:>8} {seconds * 1000.0 / len(sources):>10.1f} {tokens / seconds:>10.1f} "
+              f"{corpus_bleu(outputs[profile], references):>11.2f} "
+              f"{corpus_chrf(outputs[profile], references):>11.2f} "
+              f"{corpus_bleu(outputs[profile], quality):>13.2f} "
+              f"{corpus_chrf(outputs[profile], quality):>13.2f}")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DESCRIPTIONS
+    main(count, sys.argv[2:] or list(DECODING_PROFILES))
@@ -0,0 +1,55 @@
+"""Compara el filtrado por categoría recorriendo game_info con los índices de facetas.
+
+Uso: python -m benchmarks.bench_facets [tamaño ...]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import generate_catalog
+from game_recommender import GameRecommender
+
+DEFAULT_SIZES = [10_000, 100_000]
+REPEATS = 50
+QUERIES = [
+    {"genre": "acción", "platform": "playstation", "year": 2015},
+    {"genre": "rpg", "min_rating": 4.0},
+    {"platform": "switch", "year": 2020},
+]
+
+def scan(game_info, genre=None, platform=None, year=None, min_rating=None):
+    """Filtro por recorrido completo, como el filter_games_by_category anterior"""
+    genre = {"acción": "Action", "rpg": "RPG"}.get(genre, genre)
+    platform = {"switch": "Nintendo Switch", "playstation": "PlayStation"}.get(platform, platform)
+    results = []
+    for name, game in game_info.items():
+        if genre and genre not in game.get("genres", []):
+            continue
+        if platform and not any(p.startswith(platform) for p in game.get("platforms", [])):
+            continue
+        if year and not str(game.get("released", "")).startswith(str(year)):
+            continue
+        if min_rating is not None and float(game.get("rating", 0.0)) < min_rating:
+            continue
+        results.append(name)
+    return sorted(results, key=lambda name: float(game_info[name]["rating"]), reverse=True)
+
+def timed(function, **filters):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        result = function(**filters)
+    return result, (time.perf_counter() - start) * 1000.0 / REPEATS
+
+def main(sizes):
+    print(f"{'juegos':>10} {'consulta':<45} {'recorrido ms':>13} {'facetas ms':>11} {'resultados':>11}")
+    for size in sizes:
+        recommender = GameRecommender()
+        recommender.update_model(generate_catalog(size))
+        for filters in QUERIES:
+            scanned, scan_ms = timed(lambda **f: scan(recommender.game_info, **f), **filters)
+            rows, facet_ms = timed(recommender.facets.query, **filters)
+            assert len(scanned) == len(rows)
+            label = ", ".join(f"{key}={value}" for key, value in filters.items())
+            print(f"{size:>10} {label:<45} {scan_ms:>13.2f} {facet_ms:>11.3f} {len(rows):>11}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
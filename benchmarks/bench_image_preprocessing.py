@@ -0,0 +1,76 @@
+"""Compara el preprocesado anterior (resolución completa) con image_preprocessing.
+
+Genera una foto sintética del tamaño de una cámara de móvil con el título de un
+juego, mide tiempo y bytes de cada versión y estima la subida al OCR con un
+enlace de `UPLOAD_MBPS`. También comprueba que el realce vectorizado coincide
+con ImageEnhance + MedianFilter sobre la misma imagen.
+
+Uso: python -m benchmarks.bench_image_preprocessing [ancho alto]
+"""
+import sys
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
+
+from image_preprocessing import enhance_array, preprocess_image
+
+UPLOAD_MBPS = 5.0
+
+def synthetic_photo(width, height, seed=0):
+    """JPEG con ruido de cámara, un degradado y texto grande"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 200, width, dtype=np.float32)[None, :, None]
+    pixels = gradient + rng.normal(0, 12, (height, width, 3)).astype(np.float32)
+    img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(img)
+    for row in range(3):
+        draw.text((width // 10, height // 4 + row * height // 6), "HOLLOW KNIGHT", fill=(20, 20, 20),
+                  font_size=height // 10)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+def legacy_enhance(image_data):
+    """El enhance_image anterior: todo a resolución completa y JPEG por defecto"""
+    with Image.open(BytesIO(image_data)) as img:
+        img = img.convert("L")
+        img = ImageEnhance.Contrast(img).enhance(2.0)
+        img = ImageEnhance.Brightness(img).enhance(1.5)
+        img = img.filter(ImageFilter.MedianFilter(size=3))
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG")
+        return buffer.getvalue()
+
+def upload_ms(size):
+    return size * 8 / (UPLOAD_MBPS * 1_000_000) * 1000.0
+
+def check_parity():
+    with Image.open(BytesIO(synthetic_photo(640, 480))) as img:
+        gray = img.convert("L")
+    expected = ImageEnhance.Brightness(ImageEnhance.Contrast(gray).enhance(2.0)).enhance(1.5)
+    expected = np.asarray(expected.filter(ImageFilter.MedianFilter(size=3)), dtype=np.int16)
+    actual = enhance_array(np.asarray(gray)).astype(np.int16)
+    print(f"diferencia máxima con ImageEnhance + MedianFilter: {np.abs(expected - actual).max()} niveles")
+
+def main(width, height):
+    image_data = synthetic_photo(width, height)
+    print(f"foto de {width}x{height} ({image_data.__len__() / 1024:.0f} KB)")
+
+    start = time.perf_counter()
+    legacy = legacy_enhance(image_data)
+    legacy_ms = (time.perf_counter() - start) * 1000.0
+    data, metrics = preprocess_image(image_data)
+
+    print(f"{'versión':<10} {'ms':>9} {'KB':>8} {'subida ms':>10}")
+    print(f"{'anterior':<10} {legacy_ms:>9.1f} {len(legacy) / 1024:>8.0f} {upload_ms(len(legacy)):>10.0f}")
+    print(f"{'nueva':<10} {metrics['total_ms']:>9.1f} {len(data) / 1024:>8.0f} {upload_ms(len(data)):>10.0f}")
+    print("etapas: " + ", ".join(f"{stage}={metrics[f'{stage}_ms']:.1f} ms"
+                                 for stage in ("decode", "resize", "enhance", "encode")))
+    print(f"salida {metrics['output_size'][0]}x{metrics['output_size'][1]}, calidad JPEG {metrics['jpeg_quality']}")
+    check_parity()
+
+if __name__ == "__main__":
+    size = (int(sys.argv[1]), int(sys.argv[2])) if len(sys.argv) > 2 else (4000, 3000)
+    main(*size)
@@ -0,0 +1,76 @@
+"""Ejercita OCRSpaceClient contra el stub local: idiomas en paralelo, claves agotadas y caché.
+
+Uso: python -m benchmarks.bench_ocr
+"""
+import os
+import tempfile
+import time
+
+from benchmarks.ocr_stub_server import OCRStubServer
+from ocr_cache import OCRResultCache
+from ocr_client import OCRError, OCRSpaceClient
+
+IMAGE = os.urandom(64 * 1024)
+
+def timed(client, image=IMAGE):
+    start = time.perf_counter()
+    try:
+        text = client.extract_text(image)
+    except OCRError as e:
+        text = f"OCRError({e})"
+    return text, (time.perf_counter() - start) * 1000.0
+
+def run_languages():
+    """Español sin texto (rápido) e inglés con texto: secuencial frente a paralelo"""
+    latency = {"spa": 0.3, "eng": 0.3}
+    with OCRStubServer(texts={"spa": "", "eng": "Hollow Knight"}, latency=latency) as server:
+        for name, languages in [("secuencial (spa y luego eng)", None), ("paralelo", ("spa", "eng"))]:
+            if languages is None:
+                # Equivale al bucle anterior: una petición por idioma, una detrás de otra
+                start = time.perf_counter()
+                text = ""
+                for language in ("spa", "eng"):
+                    client = OCRSpaceClient(["K1"], url=server.url, languages=(language,))
+                    text, _ = timed(client)
+                    client.close()
+                    if text:
+                        break
+                elapsed_ms = (time.perf_counter() - start) * 1000.0
+            else:
+                client = OCRSpaceClient(["K1"], url=server.url, languages=languages)
+                text, elapsed_ms = timed(client)
+                client.close()
+            print(f"{name:<30} {text!r:<18} {elapsed_ms:>8.1f} ms")
+
+def run_exhausted_keys():
+    """Las dos primeras claves están agotadas: solo se pagan en la primera imagen"""
+    with OCRStubServer(exhausted_keys={"K1", "K2"}, latency=0.05) as server:
+        client = OCRSpaceClient(["K1", "K2", "K3"], url=server.url)
+        for attempt in range(3):
+            before = len(server.requests)
+            text, elapsed_ms = timed(client, os.urandom(1024))
+            print(f"imagen {attempt + 1}: {text!r:<18} {elapsed_ms:>8.1f} ms  peticiones={len(server.requests) - before}")
+        print(f"estado de las claves: {client.key_stats()}")
+        empty = [request for request in server.requests if request["image_bytes"] == 0]
+        print(f"peticiones con la imagen vacía: {len(empty)}")
+        client.close()
+
+def run_cache():
+    with tempfile.TemporaryDirectory() as directory, OCRStubServer(latency=0.2) as server:
+        cache = OCRResultCache(os.path.join(directory, "ocr.sqlite3"))
+        client = OCRSpaceClient(["K1"], cache=cache, url=server.url)
+        for label in ["primera subida", "misma portada otra vez"]:
+            text, elapsed_ms = timed(client)
+            print(f"{label:<30} {text!r:<18} {elapsed_ms:>8.1f} ms")
+        print(f"caché: {cache.stats()}  peticiones al stub: {len(server.requests)}")
+        client.close()
+
+def main():
+    run_languages()
+    print()
+    run_exhausted_keys()
+    print()
+    run_cache()
+
+if __name__ == "__main__":
+    main()
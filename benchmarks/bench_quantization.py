@@ -0,0 +1,64 @@
+"""Compara el modelo MarianMT en fp32 con la versión cuantizada a int8.
+
+Traduce un conjunto fijo de descripciones de cache/translations.json con ambos
+modelos y reporta latencia, tamaño de los pesos y la diferencia de BLEU/chrF
+de la versión int8 tomando como referencia la salida en fp32.
+
+Uso: python -m benchmarks.bench_quantization [descripciones]
+"""
+import io
+import json
+import sys
+import time
+
+import torch
+
+from benchmarks.metrics import corpus_bleu, corpus_chrf
+from translator import load_fp32_model, load_quantized_model, translate_paragraphs
+
+CACHE_FILE = "cache/translations.json"
+DEFAULT_DESCRIPTIONS = 10
+
+def load_descriptions(count, path=CACHE_FILE):
+    """Las primeras `count` descripciones del caché antiguo (siempre las mismas)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return list(json.load(f))[:count]
+
+def weights_mb(model):
+    """Tamaño serializado de los pesos (incluye los parámetros int8 empaquetados)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / 1e6
+
+def measure(tokenizer, model, descriptions):
+    start = time.perf_counter()
+    outputs = [translate_paragraphs(text, tokenizer, model) for text in descriptions]
+    seconds = time.perf_counter() - start
+    return outputs, seconds * 1000.0 / len(descriptions)
+
+def main(count):
+    descriptions = load_descriptions(count)
+    print(f"{len(descriptions)} descripciones de {CACHE_FILE}, {torch.get_num_threads()} hilos de CPU")
+
+    start = time.perf_counter()
+    tokenizer, fp32_model = load_fp32_model()
+    fp32_load = time.perf_counter() - start
+    start = time.perf_counter()
+    _, int8_model = load_quantized_model()
+    int8_load = time.perf_counter() - start
+
+    fp32_outputs, fp32_ms = measure(tokenizer, fp32_model, descriptions)
+    int8_outputs, int8_ms = measure(tokenizer, int8_model, descriptions)
+
+    # Referencia: la salida en fp32 (BLEU/chrF = 100 para fp32 por definición)
+    bleu = corpus_bleu(int8_outputs, fp32_outputs)
+    chrf = corpus_chrf(int8_outputs, fp32_outputs)
+
+    print(f"{'modelo':>8} {'pesos MB':>10} {'carga s':>8} {'ms/desc':>10} {'BLEU':>8} {'chrF':>8}")
+    print(f"{'fp32':>8} {weights_mb(fp32_model):>10.1f} {fp32_load:>8.2f} {fp32_ms:>10.1f} {100.0:>8.2f} {100.0:>8.2f}")
+    print(f"{'int8':>8} {weights_mb(int8_model):>10.1f} {int8_load:>8.2f} {int8_ms:>10.1f} {bleu:>8.2f} {chrf:>8.2f}")
+    print(f"Delta int8 - fp32: BLEU {bleu - 100.0:+.2f}, chrF {chrf - 100.0:+.2f}, "
+          f"latencia x{fp32_ms / int8_ms:.2f} más rápida")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DESCRIPTIONS)
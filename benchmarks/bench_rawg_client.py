@@ -0,0 +1,73 @@
+"""Ejercita RAWGClient contra el stub local: latencia con conexiones persistentes y reintentos.
+
+Cada escenario de fallos comprueba el resultado, el número de peticiones y el
+tiempo de espera; si el cliente se comporta de otra forma el script falla.
+
+Uso: python -m benchmarks.bench_rawg_client [peticiones]
+"""
+import sys
+import time
+
+import requests
+
+from benchmarks.stub_server import RAWGStubServer
+from rawg_client import RAWGClient, RAWGError
+
+DEFAULT_REQUESTS = 200
+
+def run_scenario(name, faults, expected, expected_requests, min_ms=0.0, max_ms=None, game_id=0,
+                 retry_after=0, **client_options):
+    """Ejecuta una petición con los fallos indicados y comprueba resultado, peticiones y duración"""
+    with RAWGStubServer(faults=faults, retry_after=retry_after, hang_seconds=1.0) as server:
+        client = RAWGClient("stub", base_url=server.base_url, backoff=0.01, **client_options)
+        start = time.perf_counter()
+        try:
+            client.game_details(game_id)
+            outcome = "ok"
+        except RAWGError as e:
+            outcome = f"RAWGError({e.status_code or 'conexión'})"
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        stats = client.stats()["details"]
+        client.close()
+    print(f"{name:<34} {outcome:<18} {elapsed_ms:>9.1f} ms  peticiones={stats['requests']} "
+          f"reintentos={stats['retries']} fallos={stats['failures']}")
+    assert outcome == expected, f"{name}: se esperaba {expected} y fue {outcome}"
+    assert stats["requests"] == expected_requests, \
+        f"{name}: se esperaban {expected_requests} peticiones y hubo {stats['requests']}"
+    assert elapsed_ms >= min_ms, f"{name}: no esperó lo indicado ({elapsed_ms:.0f} ms < {min_ms:.0f} ms)"
+    assert max_ms is None or elapsed_ms <= max_ms, f"{name}: tardó {elapsed_ms:.0f} ms (máximo {max_ms:.0f} ms)"
+
+def compare_pooling(count):
+    """Mismas peticiones con requests.get sin sesión y con el cliente (keep-alive)"""
+    with RAWGStubServer() as server:
+        start = time.perf_counter()
+        for game_id in range(count):
+            requests.get(f"{server.base_url}/games/{game_id}", params={"key": "stub"})
+        bare_ms = (time.perf_counter() - start) * 1000.0 / count
+
+        client = RAWGClient("stub", base_url=server.base_url)
+        start = time.perf_counter()
+        for game_id in range(count):
+            client.game_details(game_id)
+        pooled_ms = (time.perf_counter() - start) * 1000.0 / count
+        stats = client.stats()["details"]
+        client.close()
+    print(f"requests.get sin sesión: {bare_ms:.3f} ms/petición")
+    print(f"RAWGClient (pool):       {pooled_ms:.3f} ms/petición  p50={stats['p50_ms']:.3f} "
+          f"p95={stats['p95_ms']:.3f} p99={stats['p99_ms']:.3f}")
+
+def main(count):
+    compare_pooling(count)
+    print()
+    run_scenario("429 con Retry-After: 0", ["429"], "ok", 2)
+    run_scenario("429 con Retry-After: 1 (se espera)", ["429"], "ok", 2, min_ms=1000, retry_after=1)
+    run_scenario("429 con Retry-After mayor que el margen", ["429"], "RAWGError(429)", 1, max_ms=500,
+                 retry_after=60, retry_budget=10)
+    run_scenario("dos 503 y luego ok", ["503", "503"], "ok", 3)
+    run_scenario("respuesta colgada (timeout)", ["hang"], "ok", 2, read_timeout=0.2)
+    run_scenario("503 persistente", ["503"] * 10, "RAWGError(503)", 3, max_retries=2)
+    run_scenario("404 (no se reintenta)", [], "RAWGError(404)", 1, game_id=10**9)
+    print("Escenarios de reintentos: todos correctos")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REQUESTS)
@@ -0,0 +1,85 @@
+"""Memoria y latencia con muchas sesiones sobre el catálogo compartido.
+
+Cada sesión simulada (en un pool de hilos) busca unos juegos del catálogo y uno
+nuevo propio, y pide recomendaciones mientras las demás agregan juegos. Se mide
+la memoria de los perfiles con tracemalloc y se compara con el esquema anterior
+(un GameRecommender con su copia del catálogo por sesión, medido con pocas sesiones).
+
+Uso: python -m benchmarks.bench_sessions [sesiones] [tamaño del catálogo]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.synthetic import generate_catalog, generate_game
+from game_recommender import GameRecommender, UserProfile
+
+DEFAULT_SESSIONS = 500
+DEFAULT_SIZE = 20_000
+LEGACY_SESSIONS = 10
+WORKERS = 16
+
+def run_session(recommender, catalog, session):
+    rng = random.Random(session)
+    profile = UserProfile()
+    own_game = generate_game(len(catalog) + session, rng)
+    own_game["name"] = f"Session {session} Game"
+    latencies = []
+    for game in rng.sample(catalog, 3) + [own_game]:
+        start = time.perf_counter()
+        recommender.observe(profile, [game])
+        recommender.recommend(profile)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return profile, latencies
+
+def measure_shared(sessions, catalog):
+    recommender = GameRecommender()
+    recommender.update_model(catalog)
+    catalog_bytes = recommender.memory_usage
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        results = list(executor.map(lambda session: run_session(recommender, catalog, session), range(sessions)))
+    elapsed = time.perf_counter() - start
+    profiles = [profile for profile, _ in results]
+    # Lo que queda vivo son los perfiles y el crecimiento del catálogo (que se descuenta)
+    catalog_growth = recommender.memory_usage - catalog_bytes
+    used = tracemalloc.get_traced_memory()[0] - before - catalog_growth
+    tracemalloc.stop()
+
+    latencies = np.array([ms for _, session_latencies in results for ms in session_latencies])
+    missing = [s for s in range(sessions) if f"Session {s} Game" not in recommender.game_info]
+    print(f"Catálogo compartido: {len(catalog)} juegos + {sessions} nuevos ({recommender.memory_usage / 1e6:.1f} MB)")
+    print(f"  {sessions} sesiones en {elapsed:.2f} s; búsqueda + recomendación "
+          f"p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms")
+    print(f"  Memoria de las sesiones: {used / 1e6:.2f} MB ({used / sessions / 1024:.1f} KB por sesión, "
+          f"vector del perfil {profiles[0].vector.nbytes} bytes); el catálogo creció {catalog_growth / 1e6:.1f} MB")
+    print(f"  Juegos de otras sesiones visibles para todas: {'sí' if not missing else f'faltan {len(missing)}'}")
+
+def measure_legacy(sessions, catalog):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    recommenders = []
+    for _ in range(sessions):
+        recommender = GameRecommender()
+        recommender.update_model(catalog)
+        recommenders.append(recommender)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"Un recomendador por sesión ({sessions} sesiones): {used / 1e6:.1f} MB "
+          f"({used / sessions / 1e6:.2f} MB por sesión)")
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SESSIONS
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_SIZE
+    catalog = generate_catalog(size)
+    measure_shared(sessions, catalog)
+    measure_legacy(min(LEGACY_SESSIONS, sessions), catalog)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compara la carga del catálogo como lista JSON de juegos con la instantánea columnar.
+
+Mide el tiempo y la memoria (tracemalloc) de abrir cada formato y dejar listos los
+nombres, la tabla nombre -> fila y los datos de un juego.
+
+Uso: python -m benchmarks.bench_snapshot [tamaño ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import generate_catalog
+from catalog_snapshot import CatalogSnapshot, SnapshotGames, write_snapshot
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        games = json.load(f)
+    names = [game["name"] for game in games]
+    name_to_row = {name: row for row, name in enumerate(names)}
+    return {game["name"]: game for game in games}, name_to_row
+
+def load_snapshot(path):
+    snapshot = CatalogSnapshot(path)
+    name_to_row = {name: row for row, name in enumerate(snapshot.names)}
+    return SnapshotGames(snapshot, name_to_row), name_to_row
+
+def measure(load, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    games, name_to_row = load(path)
+    game = games["Synthetic Game 7"]
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed_ms, peak / 1e6, game
+
+def main(sizes):
+    print(f"{'juegos':>10} {'formato':>12} {'carga ms':>10} {'memoria MB':>12} {'disco MB':>10}")
+    for size in sizes:
+        catalog = generate_catalog(size)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "games.json")
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(catalog, f, ensure_ascii=False)
+            snapshot_path = os.path.join(directory, "snapshot")
+            write_snapshot(catalog, snapshot_path)
+            snapshot_mb = sum(entry.stat().st_size for entry in os.scandir(snapshot_path)) / 1e6
+
+            json_ms, json_mb, json_game = measure(load_json, json_path)
+            snapshot_ms, snapshot_mb_mem, snapshot_game = measure(load_snapshot, snapshot_path)
+            assert all(json_game[field] == snapshot_game[field] for field in snapshot_game)
+            print(f"{size:>10} {'json':>12} {json_ms:>10.1f} {json_mb:>12.1f} {os.path.getsize(json_path) / 1e6:>10.1f}")
+            print(f"{size:>10} {'instantánea':>12} {snapshot_ms:>10.1f} {snapshot_mb_mem:>12.1f} {snapshot_mb:>10.1f}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,48 @@
+"""Compara memoria y latencia de los modos denso y disperso de GameRecommender.
+
+Uso: python -m benchmarks.bench_storage [tamaño ...]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import generate_catalog
+from game_recommender import GameRecommender
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+QUERIES = 20
+
+def measure(storage, catalog):
+    """Construye el recomendador y mide memoria, tiempo de carga y latencia por consulta"""
+    recommender = GameRecommender(storage=storage)
+    start = time.perf_counter()
+    recommender.update_model(catalog)
+    build_ms = (time.perf_counter() - start) * 1000.0
+
+    results = []
+    start = time.perf_counter()
+    for query in range(QUERIES):
+        recent_games = catalog[query * 3:query * 3 + 3]
+        results.append([game["name"] for game in recommender.get_recommendations(recent_games)])
+    query_ms = (time.perf_counter() - start) * 1000.0 / QUERIES
+
+    return {
+        "memory_mb": recommender.memory_usage / 1e6,
+        "build_ms": build_ms,
+        "query_ms": query_ms,
+        "results": results
+    }
+
+def main(sizes):
+    print(f"{'juegos':>10} {'modo':>8} {'memoria MB':>12} {'carga ms':>10} {'consulta ms':>12}")
+    for size in sizes:
+        catalog = generate_catalog(size)
+        dense = measure("dense", catalog)
+        sparse = measure("sparse", catalog)
+        for storage, stats in (("dense", dense), ("sparse", sparse)):
+            print(f"{size:>10} {storage:>8} {stats['memory_mb']:>12.2f} "
+                  f"{stats['build_ms']:>10.1f} {stats['query_ms']:>12.3f}")
+        if dense["results"] != sparse["results"]:
+            print(f"  Aviso: los resultados difieren para {size} juegos")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,97 @@
+"""Latencia y acierto de la búsqueda local de títulos con consultas con errores.
+
+Genera títulos variados con palabras al azar, los indexa y busca títulos reales
+con errores de escritura (letras cambiadas, omitidas o repetidas). Antes comprueba
+que una secuela no se confunda con la entrega anterior guardada.
+
+Uso: python -m benchmarks.bench_title_search [tamaño ...]
+"""
+import random
+import sys
+import time
+
+from title_search import TitleIndex, sequel_numbers
+
+DEFAULT_SIZES = [10_000, 100_000]
+QUERIES = 200
+
+WORDS = [
+    "dark", "souls", "legend", "zelda", "final", "fantasy", "grand", "theft", "auto", "call", "duty",
+    "hollow", "knight", "mass", "effect", "dragon", "age", "star", "wars", "battle", "front", "red",
+    "dead", "redemption", "super", "mario", "kart", "metal", "gear", "solid", "resident", "evil",
+    "silent", "hill", "street", "fighter", "mortal", "kombat", "elder", "scrolls", "fallout", "witcher",
+    "assassin", "creed", "far", "cry", "tomb", "raider", "halo", "gears", "forza", "horizon", "sea",
+    "thieves", "monster", "hunter", "persona", "kingdom", "hearts", "crash", "bandicoot", "spyro"
+]
+
+# (consulta, título guardado, ¿debe aceptarse sin RAWG?)
+SEQUEL_CASES = [
+    ("far cry 5", "Far Cry 4", False),
+    ("resident evil 4", "Resident Evil 2", False),
+    ("grand theft auto v", "Grand Theft Auto IV", False),
+    ("fifa 22", "FIFA 21", False),
+    ("far cry", "Far Cry 4", False),
+    ("grand theft auto v", "Grand Theft Auto 5", True),
+    ("resident evil ii", "Resident Evil 2", True),
+    ("resdient evil 4", "Resident Evil 4", True),
+]
+
+def check_sequels():
+    """Falla si un título con otro número de entrega se acepta como coincidencia local"""
+    assert sequel_numbers("grand theft auto iv") == [4]
+    assert sequel_numbers("final fantasy xiv 2") == [14, 2]
+    for query, stored, accepted in SEQUEL_CASES:
+        index = TitleIndex.from_games([{"id": 1, "name": stored}])
+        match = index.best_match(query)
+        assert bool(match) == accepted, f"{query!r} contra {stored!r}: {match}"
+    # Con las dos entregas guardadas gana la del número pedido
+    index = TitleIndex.from_games([{"id": 1, "name": "Far Cry 4"}, {"id": 2, "name": "Far Cry 5"}])
+    assert index.best_match("far cry 5")["name"] == "Far Cry 5"
+    print(f"Secuelas: {len(SEQUEL_CASES) + 1} casos correctos")
+
+def generate_titles(size, rng):
+    titles = set()
+    while len(titles) < size:
+        words = rng.sample(WORDS, rng.randint(2, 4))
+        suffix = f" {rng.randint(2, 9)}" if rng.random() < 0.3 else ""
+        titles.add(" ".join(words).title() + suffix)
+    return sorted(titles)
+
+def typo(title, rng):
+    chars = list(title)
+    position = rng.randrange(len(chars))
+    kind = rng.choice(["swap", "drop", "double", "replace"])
+    if kind == "swap" and position + 1 < len(chars):
+        chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    elif kind == "drop":
+        del chars[position]
+    elif kind == "double":
+        chars.insert(position, chars[position])
+    else:
+        chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    return "".join(chars)
+
+def main(sizes):
+    check_sequels()
+    rng = random.Random(0)
+    print(f"{'títulos':>10} {'construcción s':>15} {'consulta ms':>12} {'p99 ms':>8} {'acierto':>8} {'local':>7}")
+    for size in sizes:
+        titles = generate_titles(size, rng)
+        start = time.perf_counter()
+        index = TitleIndex.from_games({"id": i, "name": title} for i, title in enumerate(titles))
+        build_s = time.perf_counter() - start
+
+        latencies, hits, local = [], 0, 0
+        for title in rng.sample(titles, QUERIES):
+            query = typo(title, rng)
+            start = time.perf_counter()
+            matches = index.search(query, limit=1)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            hits += bool(matches) and matches[0]["name"] == title
+            local += bool(index.best_match(query))
+        latencies.sort()
+        print(f"{size:>10} {build_s:>15.2f} {sum(latencies) / QUERIES:>12.2f} "
+              f"{latencies[int(0.99 * QUERIES)]:>8.2f} {hits / QUERIES:>8.0%} {local / QUERIES:>7.0%}")
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,48 @@
+"""Métricas de calidad de traducción (BLEU y chrF a nivel de corpus) sin dependencias extra."""
+import math
+from collections import Counter
+
+def _ngrams(items, n):
+    return Counter(tuple(items[i:i + n]) for i in range(len(items) - n + 1))
+
+def corpus_bleu(hypotheses, references, max_n=4):
+    """BLEU de corpus (0-100) con penalización por brevedad y tokens separados por espacios"""
+    matches = [0] * max_n
+    totals = [0] * max_n
+    hyp_length = 0
+    ref_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_tokens = hypothesis.split()
+        ref_tokens = reference.split()
+        hyp_length += len(hyp_tokens)
+        ref_length += len(ref_tokens)
+        for n in range(1, max_n + 1):
+            hyp_ngrams = _ngrams(hyp_tokens, n)
+            ref_ngrams = _ngrams(ref_tokens, n)
+            matches[n - 1] += sum(min(count, ref_ngrams[gram]) for gram, count in hyp_ngrams.items())
+            totals[n - 1] += max(len(hyp_tokens) - n + 1, 0)
+    if hyp_length == 0 or min(matches) == 0:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_n
+    brevity = 1.0 if hyp_length > ref_length else math.exp(1 - ref_length / hyp_length)
+    return 100.0 * brevity * math.exp(log_precision)
+
+def corpus_chrf(hypotheses, references, max_n=6, beta=2.0):
+    """chrF de corpus (0-100): F-beta promedio de n-gramas de caracteres sin espacios"""
+    matches = [0] * max_n
+    hyp_totals = [0] * max_n
+    ref_totals = [0] * max_n
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_chars = hypothesis.replace(" ", "")
+        ref_chars = reference.replace(" ", "")
+        for n in range(1, max_n + 1):
+            hyp_ngrams = _ngrams(hyp_chars, n)
+            ref_ngrams = _ngrams(ref_chars, n)
+            matches[n - 1] += sum(min(count, ref_ngrams[gram]) for gram, count in hyp_ngrams.items())
+            hyp_totals[n - 1] += sum(hyp_ngrams.values())
+            ref_totals[n - 1] += sum(ref_ngrams.values())
+    precision = sum(m / t for m, t in zip(matches, hyp_totals) if t) / max_n
+    recall = sum(m / t for m, t in zip(matches, ref_totals) if t) / max_n
+    if precision + recall == 0:
+        return 0.0
+    return 100.0 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
@@ -0,0 +1,108 @@
+"""Servidor HTTP local que imita `POST /parse/image` de OCR.space.
+
+Responde según la clave y el idioma del formulario: las claves de `exhausted_keys`
+reciben el mensaje de límite que envía OCR.space, y cada idioma tiene su propio
+texto y latencia. Las peticiones con la imagen vacía se rechazan como lo haría
+la API, así que los reintentos que reenvían un stream ya leído se notan.
+
+Uso:
+    with OCRStubServer(texts={"eng": "Hollow Knight"}, exhausted_keys={"K1"}) as server:
+        client = OCRSpaceClient(["K1", "K2"], url=server.url)
+"""
+import email.parser
+import email.policy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUOTA_MESSAGE = "You may only perform this action upto maximum 180 number of times within 3600 seconds"
+
+def parse_multipart(content_type, body):
+    """Campos de un formulario multipart/form-data: {nombre: bytes}"""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True) or b""
+        for part in message.iter_parts()
+    }
+
+class OCRStubServer:
+    """Stub de OCR.space en un hilo; `latency` es un número o {idioma: segundos}"""
+
+    def __init__(self, texts=None, latency=0.0, exhausted_keys=()):
+        self.texts = texts if texts is not None else {"spa": "", "eng": "Hollow Knight"}
+        self.latency = latency
+        self.exhausted_keys = set(exhausted_keys)
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/parse/image"
+
+    def _latency(self, language):
+        if isinstance(self.latency, dict):
+            return self.latency.get(language, 0.0)
+        return self.latency
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+                api_key = fields.get("apikey", b"").decode()
+                language = fields.get("language", b"").decode()
+                image = fields.get("image", b"")
+                with stub._lock:
+                    stub.requests.append({"apikey": api_key, "language": language, "image_bytes": len(image)})
+
+                if api_key in stub.exhausted_keys:
+                    return self._send(200, QUOTA_MESSAGE)
+                if not image:
+                    return self._send(200, {
+                        "IsErroredOnProcessing": True,
+                        "ErrorMessage": ["Unable to recognize the file type or file is empty"]
+                    })
+                time.sleep(stub._latency(language))
+                return self._send(200, {
+                    "IsErroredOnProcessing": False,
+                    "ParsedResults": [{"ParsedText": stub.texts.get(language, "")}]
+                })
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
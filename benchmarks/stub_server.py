@@ -0,0 +1,135 @@
+"""Servidor HTTP local que imita los endpoints de RAWG que usa la aplicación.
+
+Sirve `GET /api/games?search=...` y `GET /api/games/{id}` a partir de un catálogo
+sintético, con latencia configurable y fallos inyectados (429 con Retry-After,
+503 y respuestas colgadas) para probar RAWGClient sin red.
+
+Uso:
+    with RAWGStubServer(latency=0.01) as server:
+        client = RAWGClient("clave", base_url=server.base_url)
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import generate_catalog
+
+def details_payload(game):
+    """Detalles con la forma de la respuesta de RAWG (descripción en HTML)"""
+    return {
+        "id": game["id"],
+        "name": game["name"],
+        "description": f"<p>{game['description']}</p>\n<p>Second paragraph &amp; more.</p>",
+        "rating": game["rating"],
+        "ratings_count": game["rating_count"],
+        "released": game["released"],
+        "platforms": [{"platform": {"name": name}} for name in game["platforms"]],
+        "genres": [{"name": name} for name in game["genres"]],
+        "developers": [],
+        "publishers": [],
+        "background_image": "",
+        "metacritic": None,
+        "esrb_rating": {"name": "Teen"}
+    }
+
+class RAWGStubServer:
+    """Stub de RAWG en un hilo; `faults` es una lista de fallos a servir antes de responder bien.
+
+    Cada fallo es "429", "503" o "hang" (no responde durante `hang_seconds`).
+    """
+
+    def __init__(self, catalog=None, latency=0.0, faults=None, retry_after=0, hang_seconds=5.0):
+        self.catalog = catalog if catalog is not None else generate_catalog(1000)
+        self.by_id = {game["id"]: game for game in self.catalog}
+        self.latency = latency
+        self.faults = list(faults or [])
+        self.retry_after = retry_after
+        self.hang_seconds = hang_seconds
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}/api"
+
+    def _next_fault(self):
+        with self._lock:
+            self.requests += 1
+            return self.faults.pop(0) if self.faults else None
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Sin esto, en conexiones keep-alive las cabeceras y el cuerpo van en
+            # escrituras separadas y el ACK retrasado añade ~40 ms por respuesta
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                fault = stub._next_fault()
+                if fault == "hang":
+                    time.sleep(stub.hang_seconds)
+                    return
+                if fault == "429":
+                    return self._send(429, {"detail": "rate limited"}, {"Retry-After": str(stub.retry_after)})
+                if fault == "503":
+                    return self._send(503, {"detail": "unavailable"})
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                url = urlparse(self.path)
+                parts = [part for part in url.path.split("/") if part]
+                if parts == ["api", "games"]:
+                    query = parse_qs(url.query)
+                    search = query.get("search", [""])[0].lower()
+                    page_size = int(query.get("page_size", ["20"])[0])
+                    page = int(query.get("page", ["1"])[0])
+                    matches = [game for game in stub.catalog if search in game["name"].lower()]
+                    results = matches[(page - 1) * page_size:page * page_size]
+                    return self._send(200, {
+                        "count": len(matches),
+                        "next": None if page * page_size >= len(matches) else f"page={page + 1}",
+                        "results": [{"id": game["id"], "name": game["name"]} for game in results]
+                    })
+                if len(parts) == 3 and parts[:2] == ["api", "games"] and parts[2].isdigit():
+                    game = stub.by_id.get(int(parts[2]))
+                    if game is None:
+                        return self._send(404, {"detail": "Not found."})
+                    return self._send(200, details_payload(game))
+                self._send(404, {"detail": "Not found."})
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,394 @@
+"""Suite de micro-benchmarks de los caminos críticos, con resultados comparables entre ejecuciones.
+
+Cubre el recomendador (update_model, get_recommendations, filter_games_by_category,
+facetas), la búsqueda local de títulos, el análisis de consultas, la traducción
+con y sin acierto de caché (models/marianmt), los almacenes SQLite (juegos,
+traducciones) y las búsquedas en RAWG y OCR.space contra los stubs locales.
+
+Los casos que dependen del tamaño del catálogo se ejecutan con cada `--sizes`
+(catálogos sintéticos de 1k a 1M juegos); los casos que necesitan paquetes o
+modelos que no están instalados se marcan como omitidos en lugar de fallar.
+Los resultados se guardan en JSON y `--compare` los contrasta con otra ejecución.
+
+Uso:
+    python -m benchmarks.suite --output resultados.json
+    python -m benchmarks.suite --sizes 1000 1000000 --only recommender
+    python -m benchmarks.suite --output nuevo.json --compare base.json --fail-on-regression
+"""
+import argparse
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from benchmarks.synthetic import generate_catalog
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+MIN_SECONDS = 0.5
+MAX_REPEATS = 50
+REGRESSION_THRESHOLD = 0.10
+
+CASES = {}
+_resources = contextlib.ExitStack()
+
+class Skip(Exception):
+    """El caso no se puede ejecutar en este entorno (falta un paquete o un modelo)"""
+
+def case(name, scales=True):
+    """Registra un caso; la función recibe el tamaño del catálogo y devuelve lo que se mide"""
+    def register(function):
+        CASES[name] = (function, scales)
+        return function
+    return register
+
+def _temp_dir():
+    return _resources.enter_context(tempfile.TemporaryDirectory())
+
+@lru_cache(maxsize=None)
+def catalog(size):
+    return generate_catalog(size)
+
+@lru_cache(maxsize=None)
+def recommender(size):
+    from game_recommender import GameRecommender
+    model = GameRecommender()
+    model.update_model(catalog(size))
+    return model
+
+@lru_cache(maxsize=None)
+def translation_model():
+    try:
+        from translator import load_fp32_model
+        return load_fp32_model()
+    except Exception as e:
+        raise Skip(f"MarianMT no disponible: {e}")
+
+@lru_cache(maxsize=None)
+def rawg_stub():
+    from benchmarks.stub_server import RAWGStubServer
+    return _resources.enter_context(RAWGStubServer(catalog=catalog(1_000)))
+
+@lru_cache(maxsize=None)
+def ocr_stub():
+    from benchmarks.ocr_stub_server import OCRStubServer
+    return _resources.enter_context(OCRStubServer())
+
+# --- Recomendador ---
+
+@case("recommender.update_model")
+def bench_update_model(size):
+    from game_recommender import GameRecommender
+    games = catalog(size)
+    return lambda: GameRecommender().update_model(games)
+
+@case("recommender.update_model_incremental")
+def bench_update_model_incremental(size):
+    model = recommender(size)
+    counter = itertools.count()
+    rng = random.Random(0)
+    from benchmarks.synthetic import generate_game
+
+    def run():
+        games = [generate_game(size + next(counter), rng) for _ in range(10)]
+        for game in games:
+            game["name"] = f"Incremental {game['id']}"
+        model.update_model(games)
+    return run
+
+@case("recommender.get_recommendations")
+def bench_get_recommendations(size):
+    model = recommender(size)
+    games = catalog(size)
+    queries = itertools.cycle([games[i:i + 3] for i in range(0, min(size, 300), 3)])
+    return lambda: model.get_recommendations(next(queries))
+
+@case("recommender.filter_games_by_category")
+def bench_filter_games_by_category(size):
+    model = recommender(size)
+    return lambda: model.filter_games_by_category("Action")
+
+@case("recommender.find_games")
+def bench_find_games(size):
+    model = recommender(size)
+    return lambda: model.find_games(genre="acción", platform="playstation", year=2015, limit=10)
+
+# --- Búsqueda de títulos y consultas ---
+
+@case("title_search.search")
+def bench_title_search(size):
+    from title_search import TitleIndex
+    games = catalog(size)
+    index = TitleIndex.from_games(games)
+    queries = itertools.cycle([games[i]["name"].replace("Game", "Gmae") for i in range(0, size, max(size // 100, 1))])
+    return lambda: index.search(next(queries))
+
+@case("query_parser.cold", scales=False)
+def bench_query_cold(size):
+    try:
+        from query_parser import _relevant_words, query_words
+        query_words("warm up")
+    except ImportError as e:
+        raise Skip(f"spaCy no disponible: {e}")
+    counter = itertools.count()
+
+    def run():
+        _relevant_words.cache_clear()
+        query_words(f"quiero saber sobre the witcher {next(counter)}")
+    return run
+
+@case("query_parser.warm", scales=False)
+def bench_query_warm(size):
+    try:
+        from query_parser import query_words
+        query_words("quiero saber sobre the witcher 3")
+    except ImportError as e:
+        raise Skip(f"spaCy no disponible: {e}")
+    return lambda: query_words("quiero saber sobre the witcher 3")
+
+# --- Traducción ---
+
+TRANSLATION_TEXT = (
+    "Geralt of Rivia is a monster hunter for hire.\n\n"
+    "The open world reacts to the choices you make."
+)
+
+@case("translation.hit", scales=False)
+def bench_translation_hit(size):
+    tokenizer, model = translation_model()
+    from translation_cache import MemoryTranslationCache
+    from translator import translate_texts
+    cache = MemoryTranslationCache()
+    translate_texts([TRANSLATION_TEXT], tokenizer, model, cache=cache)
+    return lambda: translate_texts([TRANSLATION_TEXT], tokenizer, model, cache=cache)
+
+@case("translation.miss", scales=False)
+def bench_translation_miss(size):
+    tokenizer, model = translation_model()
+    from translation_cache import MemoryTranslationCache
+    from translator import translate_texts
+    return lambda: translate_texts([TRANSLATION_TEXT], tokenizer, model, cache=MemoryTranslationCache())
+
+# --- Almacenes ---
+
+@lru_cache(maxsize=None)
+def game_store(size):
+    from game_store import GameStore
+    store = GameStore(os.path.join(_temp_dir(), "games.sqlite3"), legacy_json=None, legacy_csv=None)
+    store.upsert_many(catalog(size))
+    return store
+
+@case("game_store.upsert")
+def bench_game_store_upsert(size):
+    store = game_store(size)
+    games = itertools.cycle(catalog(size)[:1000])
+    return lambda: store.upsert(next(games))
+
+@case("game_store.get")
+def bench_game_store_get(size):
+    store = game_store(size)
+    ids = itertools.cycle(range(0, size, max(size // 1000, 1)))
+    return lambda: store.get(next(ids))
+
+@case("game_store.find_by_name")
+def bench_game_store_find_by_name(size):
+    store = game_store(size)
+    names = itertools.cycle([f"synthetic game {i}" for i in range(0, size, max(size // 1000, 1))])
+    return lambda: store.find_by_name(next(names))
+
+@case("translation_cache.set_many", scales=False)
+def bench_translation_cache_set(size):
+    from translation_cache import SQLiteTranslationCache
+    cache = SQLiteTranslationCache(os.path.join(_temp_dir(), "translations.sqlite3"), legacy_json=None)
+    counter = itertools.count()
+    return lambda: cache.set_many({f"Paragraph {next(counter)}": "Párrafo" for _ in range(10)})
+
+@case("translation_cache.get_many", scales=False)
+def bench_translation_cache_get(size):
+    from translation_cache import SQLiteTranslationCache
+    cache = SQLiteTranslationCache(os.path.join(_temp_dir(), "translations.sqlite3"), legacy_json=None)
+    texts = [f"Paragraph {i}" for i in range(1000)]
+    cache.set_many({text: "Párrafo" for text in texts})
+    batches = itertools.cycle([texts[i:i + 10] for i in range(0, 1000, 10)])
+    return lambda: cache.get_many(next(batches))
+
+# --- Búsquedas remotas contra los stubs ---
+
+def _rawg_lookup():
+    from rawg_cache import CachedGameLookup, RAWGResponseCache
+    from rawg_client import RAWGClient
+    client = RAWGClient("stub", base_url=rawg_stub().base_url)
+    return CachedGameLookup(client, RAWGResponseCache(os.path.join(_temp_dir(), "rawg.sqlite3")))
+
+@case("rawg_lookup.details_miss", scales=False)
+def bench_rawg_details_miss(size):
+    lookup = _rawg_lookup()
+    ids = itertools.cycle(range(1_000))
+    # Camino de un fallo de caché: petición al stub y escritura en el caché
+    return lambda: lookup._details(next(ids))
+
+@case("rawg_lookup.details_hit", scales=False)
+def bench_rawg_details_hit(size):
+    lookup = _rawg_lookup()
+    lookup.game_details(1)
+    return lambda: lookup.game_details(1)
+
+@case("ocr.extract_text_miss", scales=False)
+def bench_ocr_miss(size):
+    from ocr_client import OCRSpaceClient
+    client = OCRSpaceClient(["K1"], url=ocr_stub().url)
+    return lambda: client.extract_text(os.urandom(16 * 1024))
+
+@case("ocr.extract_text_hit", scales=False)
+def bench_ocr_hit(size):
+    from ocr_cache import OCRResultCache
+    from ocr_client import OCRSpaceClient
+    cache = OCRResultCache(os.path.join(_temp_dir(), "ocr.sqlite3"))
+    client = OCRSpaceClient(["K1"], cache=cache, url=ocr_stub().url)
+    image = os.urandom(16 * 1024)
+    client.extract_text(image)
+    return lambda: client.extract_text(image)
+
+# --- Trazas ---
+
+@case("tracing.1000_spans_disabled", scales=False)
+def bench_spans_disabled(size):
+    from tracing import Tracer
+    tracer = Tracer(enabled=False)
+
+    def run():
+        for _ in range(1000):
+            with tracer.span("stage"):
+                pass
+    return run
+
+@case("tracing.1000_spans_enabled", scales=False)
+def bench_spans_enabled(size):
+    from tracing import Tracer
+    tracer = Tracer(enabled=True)
+
+    def run():
+        for _ in range(1000):
+            with tracer.span("stage"):
+                pass
+    return run
+
+# --- Ejecución y comparación ---
+
+def measure(run, min_seconds=MIN_SECONDS, max_repeats=MAX_REPEATS):
+    """Milisegundos de cada repetición (al menos una, hasta `min_seconds` o `max_repeats`)"""
+    run()
+    samples = []
+    started = time.perf_counter()
+    while not samples or (time.perf_counter() - started < min_seconds and len(samples) < max_repeats):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+def summarize(samples):
+    ordered = np.sort(samples)
+    return {
+        "repeats": len(samples),
+        "min_ms": float(ordered[0]),
+        "median_ms": float(np.median(ordered)),
+        "p95_ms": float(ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]),
+        "mean_ms": float(ordered.mean()),
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes, only=None, min_seconds=MIN_SECONDS):
+    results = []
+    for name, (function, scales) in CASES.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        for size in (sizes if scales else [None]):
+            entry = {"case": name, "size": size}
+            try:
+                entry.update(summarize(measure(function(size), min_seconds)))
+            except Skip as e:
+                entry["skipped"] = str(e)
+            results.append(entry)
+            label = f"{name}[{size}]" if size else name
+            if "skipped" in entry:
+                print(f"{label:<48} omitido: {entry['skipped']}")
+            else:
+                print(f"{label:<48} mediana {entry['median_ms']:>10.3f} ms  p95 {entry['p95_ms']:>10.3f} ms  "
+                      f"({entry['repeats']} repeticiones)")
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sizes": sizes,
+        },
+        "results": results,
+    }
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """Imprime la mediana de cada caso frente a la base; devuelve los casos más lentos que el umbral"""
+    base = {(entry["case"], entry["size"]): entry for entry in baseline["results"] if "median_ms" in entry}
+    regressions = []
+    print(f"\n{'caso':<48} {'base ms':>10} {'actual ms':>10} {'cambio':>8}")
+    for entry in current["results"]:
+        key = (entry["case"], entry["size"])
+        if "median_ms" not in entry or key not in base:
+            continue
+        ratio = entry["median_ms"] / base[key]["median_ms"] if base[key]["median_ms"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESIÓN"
+            regressions.append(key)
+        label = f"{entry['case']}[{entry['size']}]" if entry["size"] else entry["case"]
+        print(f"{label:<48} {base[key]['median_ms']:>10.3f} {entry['median_ms']:>10.3f} {ratio - 1:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de los caminos críticos")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="tamaños del catálogo sintético")
+    parser.add_argument("--only", nargs="+", help="prefijos de los casos a ejecutar (p. ej. recommender game_store)")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS, help="tiempo mínimo de medición por caso")
+    parser.add_argument("--output", help="archivo JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="resultados JSON de otra ejecución para comparar")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--list", action="store_true", help="listar los casos y salir")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (_, scales) in CASES.items():
+            print(f"{name}{' (por tamaño)' if scales else ''}")
+        return 0
+
+    with _resources:
+        results = run_suite(args.sizes, args.only, args.min_seconds)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Generadores de catálogos sintéticos con la forma de los datos de RAWG."""
+import random
+
+GENRES = [
+    "Action", "Indie", "Adventure", "RPG", "Strategy", "Shooter", "Casual",
+    "Simulation", "Puzzle", "Arcade", "Platformer", "Massively Multiplayer",
+    "Racing", "Sports", "Fighting", "Family", "Board Games", "Educational", "Card"
+]
+
+PLATFORMS = [
+    "PC", "PlayStation 5", "PlayStation 4", "PlayStation 3", "PlayStation 2",
+    "PlayStation", "PS Vita", "PSP", "Xbox One", "Xbox Series S/X", "Xbox 360",
+    "Xbox", "Nintendo Switch", "Nintendo 3DS", "Nintendo DS", "Wii U", "Wii",
+    "GameCube", "Nintendo 64", "Game Boy Advance", "iOS", "Android", "macOS",
+    "Linux", "Web", "Dreamcast", "SEGA Saturn", "Genesis", "NES", "SNES"
+]
+
+def generate_game(index, rng):
+    """Genera un juego con géneros, plataformas, rating y fecha aleatorios"""
+    year = rng.randint(1985, 2025)
+    return {
+        "id": index,
+        "name": f"Synthetic Game {index}",
+        "description": f"Synthetic description number {index}.",
+        "rating": round(rng.uniform(0, 5), 2),
+        "rating_count": rng.randint(0, 5000),
+        "released": f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "platforms": rng.sample(PLATFORMS, rng.randint(1, 6)),
+        "genres": rng.sample(GENRES, rng.randint(1, 3)),
+        "developers": [],
+        "publishers": [],
+        "background_image": "",
+        "metacritic": None,
+        "esrb_rating": None
+    }
+
+def generate_catalog(size, seed=0):
+    """Genera una lista de `size` juegos sintéticos reproducibles"""
+    rng = random.Random(seed)
+    return [generate_game(index, rng) for index in range(size)]
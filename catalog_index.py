@@ -0,0 +1,158 @@
+"""Índice de catálogo precalculado y compartido por todas las sesiones.
+
+El paso de construcción convierte los juegos del almacén (game_store.py) en:
+    - vectors.npy: matriz float32 con los vectores normalizados (se abre con mmap)
+    - norms.npy: norma original de cada vector
+    - los datos de cada juego como instantánea columnar (catalog_snapshot.py)
+    - catalog.json: versión y vocabulario de columnas
+
+Cada construcción se escribe en un subdirectorio nuevo y el archivo CURRENT se
+reemplaza al final para apuntar a ella: los procesos que tienen abierto el índice
+anterior siguen leyendo sus archivos y nunca se abre una mezcla de dos construcciones.
+
+Uso: python catalog_index.py
+"""
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from ann_index import create_ann_index
+from game_recommender import FeatureVocabulary, GameRecommender
+from catalog_snapshot import CatalogSnapshot, SnapshotGames, write_snapshot
+from facet_index import FacetIndex
+from game_store import GameStore
+
+CATALOG_INDEX_PATH = "data/catalog_index"
+# Índice de vecinos del recomendador: "exact" (por defecto) o "ivf" (aproximado, ver ann_index.py)
+RECOMMENDER_INDEX = os.getenv("RECOMMENDER_INDEX", "exact")
+IVF_N_PROBE = int(os.getenv("IVF_N_PROBE", "8"))
+INDEX_VERSION = 2
+CURRENT_FILE = "CURRENT"
+# Construcciones que se conservan (la actual y la anterior, que puede seguir abierta)
+KEEP_BUILDS = 2
+
+def load_stored_games(store=None):
+    """Todos los juegos del almacén (data/games.sqlite3)"""
+    return (store if store is not None else GameStore()).all_games()
+
+def _write_atomic(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+def current_build_path(path=CATALOG_INDEX_PATH):
+    """Directorio de la construcción activa del índice (None si no se ha construido)"""
+    try:
+        with open(os.path.join(path, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        # Índices construidos antes de las construcciones versionadas
+        return path if os.path.isfile(os.path.join(path, "catalog.json")) else None
+
+def _remove_old_builds(path, current):
+    builds = sorted(name for name in os.listdir(path) if name.startswith("build-") and name != current)
+    for name in builds[:max(len(builds) - (KEEP_BUILDS - 1), 0)]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+def build_catalog_index(games, path=CATALOG_INDEX_PATH):
+    """Vectoriza los juegos una sola vez y guarda el índice en disco"""
+    recommender = GameRecommender()
+    recommender.update_model(games)
+    matrix, norms, names = recommender.catalog_arrays()
+
+    catalog = {
+        "version": INDEX_VERSION,
+        "vocabulary": recommender.vocabulary.to_dict()
+    }
+
+    # La construcción va a un directorio nuevo; CURRENT se reemplaza al final
+    # para cambiar a ella de una vez
+    build = f"build-{time.time_ns()}"
+    build_path = os.path.join(path, build)
+    os.makedirs(build_path)
+    _write_atomic(os.path.join(build_path, "vectors.npy"), lambda f: np.save(f, np.ascontiguousarray(matrix)))
+    _write_atomic(os.path.join(build_path, "norms.npy"), lambda f: np.save(f, norms))
+    write_snapshot([recommender.game_info[name] for name in names], build_path)
+    _write_atomic(
+        os.path.join(build_path, "catalog.json"),
+        lambda f: f.write(json.dumps(catalog, ensure_ascii=False).encode('utf-8'))
+    )
+    _write_atomic(os.path.join(path, CURRENT_FILE), lambda f: f.write(build.encode('utf-8')))
+    _remove_old_builds(path, build)
+    return len(names)
+
+class CatalogIndex:
+    """Índice abierto en modo solo lectura; la matriz queda mapeada en memoria"""
+
+    def __init__(self, path):
+        with open(os.path.join(path, "catalog.json"), 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+        if catalog.get("version") != INDEX_VERSION:
+            raise ValueError(f"Versión de índice no soportada: {catalog.get('version')}")
+        self.path = path
+        self.vocabulary = FeatureVocabulary.from_dict(catalog["vocabulary"])
+        self.matrix = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.norms = np.load(os.path.join(path, "norms.npy"), mmap_mode="r")
+        # Los datos de los juegos se leen de la instantánea columnar sin crear un dict por juego
+        self.snapshot = CatalogSnapshot(path)
+        if len(self.matrix) != len(self.snapshot) or len(self.norms) != len(self.snapshot):
+            raise ValueError("El índice de catálogo está incompleto o se está reconstruyendo")
+        self.names = self.snapshot.names
+        self.name_to_row = {name: row for row, name in enumerate(self.names)}
+        self.games = SnapshotGames(self.snapshot, self.name_to_row)
+        self._facets = None
+        self._facets_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def facets(self):
+        """Índices de género, plataforma y año del catálogo (se construyen una vez por proceso)"""
+        with self._facets_lock:
+            if self._facets is None:
+                self._facets = FacetIndex.from_snapshot(self.snapshot)
+            return self._facets
+
+_open_indexes = {}
+_open_lock = threading.Lock()
+
+def open_catalog_index(path=CATALOG_INDEX_PATH):
+    """Abre el índice una sola vez por proceso; devuelve None si no se ha construido"""
+    build_path = current_build_path(path)
+    if build_path is None:
+        return None
+    key = os.path.abspath(path)
+    with _open_lock:
+        # Si el índice se reconstruyó, se vuelve a abrir la versión nueva
+        try:
+            version = (build_path, os.path.getmtime(os.path.join(build_path, "catalog.json")))
+            if key not in _open_indexes or _open_indexes[key][0] != version:
+                _open_indexes[key] = (version, CatalogIndex(build_path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error al abrir el índice de catálogo: {e}")
+            return None
+        return _open_indexes[key][1]
+
+def create_recommender(path=CATALOG_INDEX_PATH, index_kind=RECOMMENDER_INDEX):
+    """Catálogo del proceso sobre el índice compartido (o vacío si no existe)"""
+    options = {"n_probe": IVF_N_PROBE} if index_kind == "ivf" else {}
+    index = create_ann_index(index_kind, **options)
+    catalog = open_catalog_index(path)
+    if catalog is None:
+        recommender = GameRecommender(index=index)
+    else:
+        recommender = GameRecommender.from_index(catalog, index=index)
+    # Si el índice se construye o reconstruye después, el recomendador lo carga al usarse
+    recommender.catalog_loader = lambda: open_catalog_index(path)
+    return recommender
+
+if __name__ == "__main__":
+    games = load_stored_games()
+    total = build_catalog_index(games)
+    print(f"Índice de catálogo creado en {CATALOG_INDEX_PATH} con {total} juegos")
@@ -0,0 +1,222 @@
+"""Instantánea columnar y tipada del catálogo, para cargarlo en milisegundos.
+
+Cada columna es un archivo .npy en el mismo directorio y se abre con mmap, así
+que abrir la instantánea no lee los datos:
+    - ids.npy (int64, -1 sin id) y ratings.npy (float64)
+    - textos (name, released, background_image, description): {columna}.npy con
+      los bytes UTF-8 separados por \\0 y {columna}_offsets.npy con n+1 posiciones
+    - listas (genres, platforms) codificadas con diccionario: {columna}_codes.npy
+      con los códigos de todos los juegos seguidos y {columna}_offsets.npy
+    - meta.json: versión, número de juegos y los diccionarios de géneros y plataformas
+
+Todas las columnas se mapean al abrir la instantánea (sin leerlas): si después
+se reemplazan los archivos, la instantánea abierta sigue viendo los anteriores.
+La descripción solo se lee cuando se pide la de algún juego.
+
+Uso:
+    python catalog_snapshot.py export [directorio]   # del almacén de juegos a la instantánea
+    python catalog_snapshot.py import [directorio]   # de la instantánea al almacén
+"""
+import json
+import os
+import sys
+from collections.abc import Mapping
+
+import numpy as np
+
+from storage import game_rating
+
+CATALOG_SNAPSHOT_PATH = "data/catalog_snapshot"
+SNAPSHOT_VERSION = 1
+
+TEXT_COLUMNS = ["name", "released", "background_image", "description"]
+LIST_COLUMNS = ["genres", "platforms"]
+SEPARATOR = b"\0"
+
+def _save(path, name, array):
+    tmp_path = os.path.join(path, f"{name}.npy.tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+
+def _encode_texts(values):
+    """(bytes separados por \\0, offsets) de una lista de textos"""
+    encoded = [(value or "").replace("\0", "").encode('utf-8') + SEPARATOR for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+def _encode_lists(lists):
+    """(diccionario de valores, códigos, offsets) de una lista de listas de textos"""
+    dictionary = {}
+    codes = [dictionary.setdefault(value, len(dictionary)) for values in lists for value in values]
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum([len(values) for values in lists], out=offsets[1:])
+    return list(dictionary), np.asarray(codes, dtype=np.int32), offsets
+
+def write_snapshot(games, path=CATALOG_SNAPSHOT_PATH):
+    """Escribe la instantánea de una lista de juegos; devuelve cuántos se guardaron"""
+    games = [game for game in games if game.get("name")]
+    os.makedirs(path, exist_ok=True)
+    _save(path, "ids", np.asarray(
+        [game["id"] if game.get("id") is not None else -1 for game in games], dtype=np.int64
+    ))
+    _save(path, "ratings", np.asarray([game_rating(game) for game in games], dtype=np.float64))
+    for column in TEXT_COLUMNS:
+        blob, offsets = _encode_texts([game.get(column) for game in games])
+        _save(path, column, blob)
+        _save(path, f"{column}_offsets", offsets)
+    dictionaries = {}
+    for column in LIST_COLUMNS:
+        dictionaries[column], codes, offsets = _encode_lists([game.get(column) or [] for game in games])
+        _save(path, f"{column}_codes", codes)
+        _save(path, f"{column}_offsets", offsets)
+
+    # meta.json va al final porque es el que determina si la instantánea está completa
+    meta = {"version": SNAPSHOT_VERSION, "count": len(games), "dictionaries": dictionaries}
+    tmp_path = os.path.join(path, "meta.json.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+    return len(games)
+
+class CatalogSnapshot:
+    """Instantánea abierta en modo solo lectura; todas las columnas quedan mapeadas al abrirla"""
+
+    def __init__(self, path=CATALOG_SNAPSHOT_PATH):
+        with open(os.path.join(path, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Versión de instantánea no soportada: {meta.get('version')}")
+        self.path = path
+        self.count = meta["count"]
+        self.dictionaries = meta["dictionaries"]
+        # Se mapean todas ahora para no mezclar columnas de dos escrituras distintas
+        names = ["ids", "ratings"]
+        names += [name for column in TEXT_COLUMNS for name in (column, f"{column}_offsets")]
+        names += [name for column in LIST_COLUMNS for name in (f"{column}_codes", f"{column}_offsets")]
+        self._columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        self._names = None
+        self._rows_by_id = None
+        if len(self.column("ids")) != self.count:
+            raise ValueError("La instantánea del catálogo está incompleta")
+
+    def __len__(self):
+        return self.count
+
+    def column(self, name):
+        """Array de una columna (mapeado en memoria)"""
+        return self._columns[name]
+
+    def text(self, column, row):
+        offsets = self.column(f"{column}_offsets")
+        return self.column(column)[offsets[row]:offsets[row + 1] - 1].tobytes().decode('utf-8')
+
+    def texts(self, column):
+        """Todos los valores de una columna de texto (se decodifica de una vez)"""
+        blob = self.column(column)
+        return blob[:-1].tobytes().decode('utf-8').split("\0") if len(blob) else []
+
+    def values(self, column, row):
+        offsets = self.column(f"{column}_offsets")
+        dictionary = self.dictionaries[column]
+        return [dictionary[code] for code in self.column(f"{column}_codes")[offsets[row]:offsets[row + 1]]]
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = self.texts("name")
+        return self._names
+
+    def row_for_id(self, game_id):
+        """Fila del juego con ese id de RAWG (None si no está)"""
+        if self._rows_by_id is None:
+            ids = self.column("ids")
+            self._rows_by_id = {value: row for row, value in enumerate(ids.tolist()) if value >= 0}
+        return self._rows_by_id.get(game_id)
+
+    def game(self, row, description=False):
+        """Datos del juego de una fila; la descripción solo se lee si se pide"""
+        game_id = int(self.column("ids")[row])
+        game = {
+            "id": game_id if game_id >= 0 else None,
+            "name": self.names[row],
+            "rating": float(self.column("ratings")[row]),
+            "released": self.text("released", row),
+            "genres": self.values("genres", row),
+            "platforms": self.values("platforms", row),
+            "background_image": self.text("background_image", row)
+        }
+        if description:
+            game["description"] = self.text("description", row)
+        return game
+
+    def iter_games(self, description=False):
+        for row in range(self.count):
+            yield self.game(row, description)
+
+class SnapshotGames(Mapping):
+    """Vista nombre -> datos del juego que solo construye los diccionarios que se piden"""
+
+    def __init__(self, snapshot, name_to_row):
+        self.snapshot = snapshot
+        self.name_to_row = name_to_row
+
+    def __getitem__(self, name):
+        return self.snapshot.game(self.name_to_row[name])
+
+    def __contains__(self, name):
+        return name in self.name_to_row
+
+    def __iter__(self):
+        return iter(self.name_to_row)
+
+    def __len__(self):
+        return len(self.name_to_row)
+
+def export_snapshot(store=None, path=CATALOG_SNAPSHOT_PATH):
+    """Escribe la instantánea con todos los juegos del almacén"""
+    from game_store import GameStore
+    store = store if store is not None else GameStore()
+    return write_snapshot(store.all_games(), path)
+
+def _merge_batch(store, batch):
+    """Juegos del lote listos para guardar: los que ya están conservan los campos que la instantánea no tiene"""
+    stored = store.get_many(game["id"] for game in batch if "id" in game)
+    merged = []
+    for game in batch:
+        existing = stored.get(game["id"]) if "id" in game else store.find_by_name(game["name"])
+        merged.append({**existing, **game} if existing else game)
+    return merged
+
+def import_snapshot(store=None, path=CATALOG_SNAPSHOT_PATH, batch_size=1000):
+    """Guarda en el almacén todos los juegos de la instantánea.
+
+    La instantánea solo tiene algunas columnas, así que los juegos que ya están
+    en el almacén se actualizan sobre su registro completo (no se sustituyen).
+    """
+    from game_store import GameStore
+    store = store if store is not None else GameStore()
+    snapshot = CatalogSnapshot(path)
+    batch = []
+    for game in snapshot.iter_games(description=True):
+        if game["id"] is None:
+            del game["id"]
+        batch.append(game)
+        if len(batch) >= batch_size:
+            store.upsert_many(_merge_batch(store, batch))
+            batch = []
+    store.upsert_many(_merge_batch(store, batch))
+    return len(snapshot)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    snapshot_path = sys.argv[2] if len(sys.argv) > 2 else CATALOG_SNAPSHOT_PATH
+    if command == "export":
+        total = export_snapshot(path=snapshot_path)
+        print(f"Instantánea del catálogo creada en {snapshot_path} con {total} juegos")
+    elif command == "import":
+        total = import_snapshot(path=snapshot_path)
+        print(f"Importados {total} juegos de {snapshot_path} al almacén")
+    else:
+        sys.exit(f"Comando desconocido: {command} (usa export o import)")
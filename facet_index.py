@@ -0,0 +1,183 @@
+"""Índices invertidos de género, plataforma y año sobre las filas del catálogo.
+
+Cada valor (p. ej. "action", "playstation 4" o 2015) tiene su lista de filas
+ordenada por rating de mayor a menor, así que el rating mínimo es un corte con
+búsqueda binaria y los filtros combinados se resuelven recorriendo la lista más
+corta con una máscara de las demás (se conserva el orden por rating).
+
+Las plataformas también se indexan por familia (la primera palabra: "playstation",
+"xbox", "nintendo"...), y las palabras que produce interpret_query ("acción",
+"carreras", "switch"...) se traducen con GENRE_ALIASES y PLATFORM_ALIASES.
+
+Un índice puede apoyarse en otro de solo lectura (`base`), como el del índice de
+catálogo compartido: las filas propias empiezan donde acaban las de la base.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from storage import game_rating
+
+GENRE_ALIASES = {
+    "acción": "action",
+    "aventura": "adventure",
+    "estrategia": "strategy",
+    "deportes": "sports",
+    "carreras": "racing",
+    "simulación": "simulation",
+    "plataformas": "platformer",
+    "disparos": "shooter",
+    "lucha": "fighting",
+    "rol": "rpg",
+}
+
+PLATFORM_ALIASES = {
+    "switch": "nintendo switch",
+    "mac": "macos",
+    "steam": "pc",
+    "browser": "web",
+    "playstation vita": "ps vita",
+}
+
+def _year(released):
+    """Año de una fecha YYYY-MM-DD (None si no tiene)"""
+    if isinstance(released, str) and len(released) >= 4 and released[:4].isdigit():
+        return int(released[:4])
+    return None
+
+def genre_keys(genre):
+    return [("genre", genre.lower())]
+
+def platform_keys(platform):
+    name = platform.lower()
+    family = name.split()[0] if name.split() else name
+    return [("platform", name)] if family == name else [("platform", name), ("platform", family)]
+
+def facet_keys(game):
+    """Claves (faceta, valor) bajo las que se indexa un juego"""
+    keys = set()
+    for genre in game.get("genres") or []:
+        keys.update(genre_keys(genre))
+    for platform in game.get("platforms") or []:
+        keys.update(platform_keys(platform))
+    year = _year(game.get("released"))
+    if year is not None:
+        keys.add(("year", year))
+    return keys
+
+def filter_keys(genre=None, platform=None, year=None):
+    """Claves de los filtros de una consulta (con los alias de interpret_query)"""
+    keys = []
+    if genre:
+        genre = genre.lower()
+        keys.append(("genre", GENRE_ALIASES.get(genre, genre)))
+    if platform:
+        platform = platform.lower()
+        keys.append(("platform", PLATFORM_ALIASES.get(platform, platform)))
+    if year:
+        keys.append(("year", int(str(year)[:4])))
+    return keys
+
+class FacetIndex:
+    def __init__(self, base=None):
+        self.base = base
+        self.first_row = len(base) if base is not None else 0
+        self._ratings = np.zeros(0, dtype=np.float64)
+        self._count = 0
+        self._rows_by_key = defaultdict(list)
+        # Listas ya ordenadas: clave -> (filas, -rating de cada fila), propias y unidas a la base
+        self._postings = {}
+        self._merged = {}
+
+    def __len__(self):
+        return self.first_row + self._count
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Índice de todas las filas de una instantánea del catálogo (sin crear un dict por juego)"""
+        index = cls()
+        index._ratings = np.asarray(snapshot.column("ratings"), dtype=np.float64)
+        index._count = len(snapshot)
+        rows = np.arange(len(snapshot), dtype=np.int64)
+        rows_by_key = defaultdict(list)
+        for column, keys_for in [("genres", genre_keys), ("platforms", platform_keys)]:
+            codes = np.asarray(snapshot.column(f"{column}_codes"))
+            code_rows = np.repeat(rows, np.diff(snapshot.column(f"{column}_offsets")))
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(snapshot.dictionaries[column]) + 1))
+            for code, value in enumerate(snapshot.dictionaries[column]):
+                for key in keys_for(value):
+                    rows_by_key[key].append(code_rows[order[bounds[code]:bounds[code + 1]]])
+        years = np.array([_year(released) or 0 for released in snapshot.texts("released")], dtype=np.int64)
+        for year in np.unique(years[years > 0]):
+            rows_by_key[("year", int(year))].append(rows[years == year])
+        for key, parts in rows_by_key.items():
+            index._postings[key] = index._sort(np.unique(np.concatenate(parts)))
+        return index
+
+    def _sort(self, rows):
+        """(filas, -rating) ordenadas por rating descendente (a igual rating, por fila)"""
+        negative = -self._ratings[rows - self.first_row]
+        order = np.lexsort((rows, negative))
+        return rows[order].astype(np.int64), negative[order]
+
+    def add(self, row, game):
+        """Indexa el juego de la fila `row` (las filas se agregan en orden)"""
+        if row != len(self):
+            raise ValueError(f"Se esperaba la fila {len(self)} y llegó la {row}")
+        self._ratings = _grow_1d(self._ratings, self._count + 1)
+        self._ratings[self._count] = game_rating(game)
+        self._count += 1
+        for key in facet_keys(game):
+            self._rows_by_key[key].append(row)
+            self._postings.pop(key, None)
+            self._merged.pop(key, None)
+
+    def posting(self, key):
+        """(filas, -rating) de una clave, ordenadas por rating descendente"""
+        if self.base is None:
+            return self._own_posting(key)
+        if key not in self._merged:
+            self._merged[key] = self._merge(self.base.posting(key), self._own_posting(key))
+        return self._merged[key]
+
+    def _own_posting(self, key):
+        if key not in self._postings:
+            rows = self._rows_by_key.get(key)
+            if rows:
+                self._postings[key] = self._sort(np.asarray(rows, dtype=np.int64))
+        return self._postings.get(key)
+
+    @staticmethod
+    def _merge(base, own):
+        if base is None or own is None:
+            return own if base is None else base
+        # Intercalar las filas propias (pocas) en la lista de la base sin reordenarla
+        positions = np.searchsorted(base[1], own[1], side="right")
+        return np.insert(base[0], positions, own[0]), np.insert(base[1], positions, own[1])
+
+    def query(self, genre=None, platform=None, year=None, min_rating=None, limit=None):
+        """Filas que cumplen todos los filtros, de mayor a menor rating"""
+        keys = filter_keys(genre, platform, year)
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        postings = [self.posting(key) for key in keys]
+        if any(posting is None for posting in postings):
+            return np.zeros(0, dtype=np.int64)
+        postings.sort(key=lambda posting: len(posting[0]))
+        rows, negative = postings[0]
+        if min_rating is not None:
+            end = np.searchsorted(negative, -float(min_rating), side="right")
+            rows = rows[:end]
+        for other, _ in postings[1:]:
+            mask = np.zeros(len(self), dtype=bool)
+            mask[other] = True
+            rows = rows[mask[rows]]
+        return rows[:limit] if limit is not None else rows
+
+def _grow_1d(array, size):
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, len(array) * 2, 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
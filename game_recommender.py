@@ -1,20 +1,527 @@
 import numpy as np
+from scipy.sparse import csr_matrix
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
-from collections import defaultdict
+from ann_index import ExactIndex
+from facet_index import FacetIndex
+from tracing import traced
+from collections import ChainMap, defaultdict
+import copy
+import threading
 import torch
 import torch.nn as nn
 from datetime import datetime
+import os
+import time
 
-class GameRecommender:
+# Cada cuántos segundos se comprueba si el índice de catálogo se reconstruyó
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "10"))
+
+class FeatureVocabulary:
+    """Vocabulario estable de columnas: las características nuevas solo se agregan al final.
+    
+    Las dos primeras columnas son numéricas (rating y año); después vienen los
+    géneros y plataformas en el orden en que aparecieron por primera vez, de modo
+    que el índice de una columna nunca cambia y los vectores existentes siguen
+    siendo válidos (las columnas nuevas son ceros implícitos).
+    """
+    NUMERIC_COLUMNS = 2
+    
+    def __init__(self):
+        self.genres = {}
+        self.platforms = {}
+    
+    def __len__(self):
+        return self.NUMERIC_COLUMNS + len(self.genres) + len(self.platforms)
+    
+    def _add(self, table, values):
+        added = 0
+        for value in values:
+            if value not in table:
+                table[value] = len(self)
+                added += 1
+        return added
+    
+    def add_game(self, game):
+        """Registra los géneros y plataformas de un juego; devuelve cuántas columnas se agregaron"""
+        return (self._add(self.genres, game.get("genres", []))
+                + self._add(self.platforms, game.get("platforms", [])))
+    
+    def columns(self, game):
+        """Índices de las columnas one-hot activas para un juego"""
+        columns = {self.genres[g] for g in game.get("genres", []) if g in self.genres}
+        columns.update(self.platforms[p] for p in game.get("platforms", []) if p in self.platforms)
+        return sorted(columns)
+    
+    def copy(self):
+        vocabulary = FeatureVocabulary()
+        vocabulary.genres = dict(self.genres)
+        vocabulary.platforms = dict(self.platforms)
+        return vocabulary
+    
+    def to_dict(self):
+        return {"genres": self.genres, "platforms": self.platforms}
+    
+    @classmethod
+    def from_dict(cls, data):
+        vocabulary = cls()
+        vocabulary.genres = dict(data.get("genres", {}))
+        vocabulary.platforms = dict(data.get("platforms", {}))
+        return vocabulary
+
+def _grow(array, size):
+    """Devuelve `array` con capacidad para al menos `size` elementos (duplicando)"""
+    if size <= len(array):
+        return array
+    grown = np.zeros((max(size, len(array) * 2, 16),) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+def _encode_row(columns, numeric):
+    """Norma L2 y factor de normalización de una fila one-hot + numérica"""
+    norm = np.sqrt(len(columns) + numeric[0] ** 2 + numeric[1] ** 2)
+    return norm, (1.0 / norm if norm > 0 else 1.0)
+
+class DenseGameMatrix:
+    """Almacenamiento denso: matriz float32 contigua con filas normalizadas (L2).
+    
+    Reserva capacidad extra en filas y columnas; las columnas nuevas del
+    vocabulario ya están en cero para las filas existentes.
+    """
+    
+    def __init__(self):
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes + self.norms.nbytes
+    
+    def _ensure_capacity(self, rows, columns):
+        capacity, dim = self.matrix.shape
+        if rows <= capacity and columns <= dim:
+            return
+        new_capacity = max(rows, capacity * 2, 16) if rows > capacity else capacity
+        new_dim = max(columns, dim * 2, 16) if columns > dim else dim
+        matrix = np.zeros((new_capacity, new_dim), dtype=np.float32)
+        matrix[:self.size, :dim] = self.matrix[:self.size]
+        self.matrix = matrix
+        self.norms = _grow(self.norms, new_capacity)
+    
+    def append(self, encoded_rows, dim):
+        """Agrega filas codificadas como (columnas one-hot, (rating, año))"""
+        self._ensure_capacity(self.size + len(encoded_rows), dim)
+        for columns, numeric in encoded_rows:
+            norm, scale = _encode_row(columns, numeric)
+            self.matrix[self.size, :FeatureVocabulary.NUMERIC_COLUMNS] = numeric
+            self.matrix[self.size, :FeatureVocabulary.NUMERIC_COLUMNS] *= scale
+            self.matrix[self.size, columns] = scale
+            self.norms[self.size] = norm
+            self.size += 1
+    
+    def raw_rows(self, rows, dim):
+        """Vectores originales (sin normalizar) de las filas indicadas"""
+        return self.matrix[rows, :dim] * self.norms[rows, None]
+    
+    def normalized_rows(self, rows, dim):
+        """Vectores normalizados de las filas indicadas"""
+        return self.matrix[rows, :dim]
+    
+    def scores(self, query, dim):
+        """Producto de todas las filas normalizadas con un vector consulta"""
+        return self.matrix[:self.size, :dim] @ query
+    
+    def row_scores(self, rows, query, dim):
+        """Producto de un subconjunto de filas normalizadas con un vector consulta"""
+        return self.matrix[rows, :dim] @ query
+
+class SparseGameMatrix:
+    """Almacenamiento disperso: CSR para las columnas one-hot y denso para rating/año.
+    
+    Los arreglos CSR (indptr, indices, data) crecen por duplicación; la matriz
+    de scipy se arma sobre ellos sin copiar y se reutiliza hasta el siguiente cambio.
+    """
+    
+    def __init__(self):
+        self.numeric = np.zeros((0, FeatureVocabulary.NUMERIC_COLUMNS), dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.data = np.zeros(0, dtype=np.float32)
+        self.size = 0
+        self._csr = None
+    
+    def __len__(self):
+        return self.size
+    
+    @property
+    def nnz(self):
+        return int(self.indptr[self.size])
+    
+    @property
+    def nbytes(self):
+        return (self.numeric.nbytes + self.norms.nbytes + self.indptr.nbytes
+                + self.indices.nbytes + self.data.nbytes)
+    
+    def append(self, encoded_rows, dim):
+        """Agrega filas codificadas como (columnas one-hot, (rating, año))"""
+        new_size = self.size + len(encoded_rows)
+        nnz = self.nnz + sum(len(columns) for columns, _ in encoded_rows)
+        self.numeric = _grow(self.numeric, new_size)
+        self.norms = _grow(self.norms, new_size)
+        self.indptr = _grow(self.indptr, new_size + 1)
+        self.indices = _grow(self.indices, nnz)
+        self.data = _grow(self.data, nnz)
+        position = self.nnz
+        for columns, numeric in encoded_rows:
+            norm, scale = _encode_row(columns, numeric)
+            self.numeric[self.size] = numeric
+            self.numeric[self.size] *= scale
+            self.norms[self.size] = norm
+            end = position + len(columns)
+            self.indices[position:end] = np.asarray(columns, dtype=np.int32) - FeatureVocabulary.NUMERIC_COLUMNS
+            self.data[position:end] = scale
+            position = end
+            self.size += 1
+            self.indptr[self.size] = position
+        self._csr = None
+    
+    def _csr_matrix(self, dim):
+        shape = (self.size, dim - FeatureVocabulary.NUMERIC_COLUMNS)
+        if self._csr is None or self._csr.shape != shape:
+            nnz = self.nnz
+            self._csr = csr_matrix(
+                (self.data[:nnz], self.indices[:nnz], self.indptr[:self.size + 1]),
+                shape=shape,
+                copy=False
+            )
+        return self._csr
+    
+    def normalized_rows(self, rows, dim):
+        """Vectores normalizados (densos) de las filas indicadas"""
+        vectors = np.zeros((len(rows), dim), dtype=np.float32)
+        vectors[:, :FeatureVocabulary.NUMERIC_COLUMNS] = self.numeric[rows]
+        vectors[:, FeatureVocabulary.NUMERIC_COLUMNS:] = self._csr_matrix(dim)[rows].toarray()
+        return vectors
+    
+    def raw_rows(self, rows, dim):
+        """Vectores originales (sin normalizar) de las filas indicadas"""
+        return self.normalized_rows(rows, dim) * self.norms[rows, None]
+    
+    def scores(self, query, dim):
+        """Producto de todas las filas normalizadas con un vector consulta"""
+        numeric_query = query[:FeatureVocabulary.NUMERIC_COLUMNS]
+        return (self._csr_matrix(dim) @ query[FeatureVocabulary.NUMERIC_COLUMNS:]
+                + self.numeric[:self.size] @ numeric_query).astype(np.float32)
+    
+    def row_scores(self, rows, query, dim):
+        """Producto de un subconjunto de filas normalizadas con un vector consulta"""
+        numeric_query = query[:FeatureVocabulary.NUMERIC_COLUMNS]
+        return (self._csr_matrix(dim)[rows] @ query[FeatureVocabulary.NUMERIC_COLUMNS:]
+                + self.numeric[rows] @ numeric_query).astype(np.float32)
+
+class MappedGameMatrix:
+    """Catálogo base de solo lectura (p. ej. memoria mapeada) más las filas agregadas después.
+    
+    Las filas base se comparten entre procesos y nunca se modifican; los juegos
+    nuevos van a una matriz densa pequeña que se consulta a continuación.
+    """
+    
+    def __init__(self, base_matrix, base_norms):
+        self.base = base_matrix
+        self.base_norms = base_norms
+        self.overlay = DenseGameMatrix()
+    
+    def __len__(self):
+        return len(self.base) + len(self.overlay)
+    
+    @property
+    def nbytes(self):
+        # La matriz base es compartida; solo cuenta lo agregado después
+        return self.overlay.nbytes
+    
+    def append(self, encoded_rows, dim):
+        self.overlay.append(encoded_rows, dim)
+    
+    def _split(self, rows):
+        rows = np.asarray(rows, dtype=np.int64)
+        in_base = rows < len(self.base)
+        return rows, in_base
+    
+    def normalized_rows(self, rows, dim):
+        """Vectores normalizados de las filas indicadas"""
+        rows, in_base = self._split(rows)
+        vectors = np.zeros((len(rows), dim), dtype=np.float32)
+        base_dim = self.base.shape[1]
+        if in_base.any():
+            vectors[in_base, :base_dim] = self.base[rows[in_base]]
+        if not in_base.all():
+            vectors[~in_base] = self.overlay.normalized_rows(rows[~in_base] - len(self.base), dim)
+        return vectors
+    
+    def raw_rows(self, rows, dim):
+        """Vectores originales (sin normalizar) de las filas indicadas"""
+        rows, in_base = self._split(rows)
+        norms = np.zeros(len(rows), dtype=np.float32)
+        norms[in_base] = self.base_norms[rows[in_base]]
+        norms[~in_base] = self.overlay.norms[rows[~in_base] - len(self.base)]
+        return self.normalized_rows(rows, dim) * norms[:, None]
+    
+    def scores(self, query, dim):
+        """Producto de todas las filas normalizadas con un vector consulta"""
+        # Las columnas agregadas después de construir el índice valen cero en la base
+        scores = self.base @ query[:self.base.shape[1]]
+        if len(self.overlay):
+            scores = np.concatenate([scores, self.overlay.scores(query, dim)])
+        return scores
+    
+    def row_scores(self, rows, query, dim):
+        """Producto de un subconjunto de filas normalizadas con un vector consulta"""
+        return self.normalized_rows(rows, dim) @ query
+
+class _LayeredNames:
+    """Lista de nombres de filas: la parte base es compartida y solo se agrega al final"""
+    
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+    
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+    
+    def __getitem__(self, row):
+        if row < len(self.base):
+            return self.base[row]
+        return self.extra[row - len(self.base)]
+    
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+    
+    def append(self, name):
+        self.extra.append(name)
+
+class ReadWriteLock:
+    """Varios lectores a la vez o un solo escritor; un escritor en espera frena a los lectores nuevos"""
+    
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._read = _LockSide(self.acquire_read, self.release_read)
+        self._write = _LockSide(self.acquire_write, self.release_write)
+    
+    def read(self):
+        return self._read
+    
+    def write(self):
+        return self._write
+    
+    def acquire_read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+    
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if not self._readers and self._waiting_writers:
+                self._condition.notify_all()
+    
+    def acquire_write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+    
+    def release_write(self):
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+class _LockSide:
+    """Contexto with para un lado del candado (sin crear un generador en cada uso)"""
+    
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+    
+    def __enter__(self):
+        self._acquire()
+    
+    def __exit__(self, *exc):
+        self._release()
+        return False
+
+class UserProfile:
+    """Perfil de una sesión: suma de los vectores de los juegos vistos y sus nombres.
+    
+    Los juegos y sus vectores viven en el catálogo compartido (GameRecommender);
+    el perfil solo ocupa un vector de la dimensión del vocabulario.
+    """
+    
     def __init__(self):
+        self.vector = np.zeros(0, dtype=np.float32)
+        self.seen = set()
+        # Versión del catálogo a la que corresponden las columnas del vector
+        self.generation = None
+    
+    def __len__(self):
+        return len(self.seen)
+    
+    def add(self, names, vectors):
+        """Suma los vectores originales de juegos nuevos para el perfil"""
+        if not names:
+            return
+        if vectors.shape[1] > len(self.vector):
+            # Las columnas nuevas del vocabulario valen cero para los juegos ya vistos
+            grown = np.zeros(vectors.shape[1], dtype=np.float32)
+            grown[:len(self.vector)] = self.vector
+            self.vector = grown
+        self.vector[:vectors.shape[1]] += vectors.sum(axis=0)
+        self.seen.update(names)
+    
+    def query(self, dim):
+        """Vector consulta normalizado con la dimensión actual del catálogo"""
+        query = np.zeros(dim, dtype=np.float32)
+        query[:len(self.vector)] = self.vector
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+STORAGE_BACKENDS = {
+    "dense": DenseGameMatrix,
+    "sparse": SparseGameMatrix,
+}
+
+class GameRecommender:
+    """Catálogo compartido por todas las sesiones del proceso.
+    
+    Las consultas se hacen con el candado de lectura (varias a la vez) y las
+    altas de juegos con el de escritura; lo propio de cada sesión va en un UserProfile.
+    """
+    
+    def __init__(self, storage="dense", index=None):
+        if storage not in STORAGE_BACKENDS:
+            raise ValueError(f"Modo de almacenamiento desconocido: {storage}")
         self.genre_weights = defaultdict(float)
         self.platform_weights = defaultdict(float)
-        self.game_vectors = {}
         self.game_info = {}
         self.scaler = StandardScaler()
-        self.all_genres = set()
-        self.all_platforms = set()
+        self.vocabulary = FeatureVocabulary()
+        # Catálogo como matriz (densa o CSR) con filas normalizadas (L2)
+        # y un índice nombre <-> fila para puntuar con un solo producto
+        self.storage = storage
+        self._store = STORAGE_BACKENDS[storage]()
+        # Índice de vecinos aproximados; por defecto la búsqueda es exacta
+        self.index = index if index is not None else ExactIndex()
+        self._row_names = []
+        self._name_to_row = {}
+        # Índices invertidos género/plataforma/año -> filas ordenadas por rating
+        self.facets = FacetIndex()
+        self.last_update_stats = None
+        # Juegos recientes necesarios para recomendar (el catálogo se arma con ellos)
+        self.min_recent_games = 2
+        self._lock = ReadWriteLock()
+        # Índice de catálogo en uso y función que devuelve el actual (para recargarlo si se reconstruye)
+        self.catalog_loader = None
+        self._catalog = None
+        self._next_catalog_check = 0.0
+        self.generation = 0
+
+    @classmethod
+    def from_index(cls, catalog, index=None):
+        """Crea un recomendador sobre un índice de catálogo precalculado.
+        
+        Los vectores, nombres y datos del índice se usan en solo lectura (mapeados en
+        memoria); los juegos que se agreguen después se guardan aparte. `index` es el
+        índice de vecinos (exacto por defecto); se entrena aquí con todo el catálogo.
+        """
+        recommender = cls(index=index)
+        recommender._attach_index(catalog, recommender._index_for(catalog))
+        return recommender
+    
+    def _index_for(self, catalog):
+        """Copia vacía del índice de vecinos entrenada con las filas del catálogo.
+
+        Se llama sin candados: entrenar un IVF sobre todo el catálogo tarda y las
+        consultas siguen usando el índice actual mientras tanto.
+        """
+        index = copy.copy(self.index)
+        index.reset()
+        if index.needs_training(len(catalog)):
+            rows = MappedGameMatrix(catalog.matrix, catalog.norms)
+            index.train(lambda selected: rows.normalized_rows(selected, len(catalog.vocabulary)), len(catalog))
+        return index
+    
+    def _attach_index(self, catalog, index):
+        """Usa el índice como base del catálogo (con el candado de escritura si ya está compartido)"""
+        self.vocabulary = catalog.vocabulary.copy()
+        self.game_info = ChainMap({}, catalog.games)
+        self._store = MappedGameMatrix(catalog.matrix, catalog.norms)
+        self._row_names = _LayeredNames(catalog.names)
+        self._name_to_row = ChainMap({}, catalog.name_to_row)
+        self.facets = FacetIndex(base=catalog.facets)
+        self.index = index
+        self._catalog = catalog
+        # Las columnas pueden cambiar: los perfiles se recalculan con la nueva generación
+        self.generation += 1
+        # Con el catálogo precargado ya se puede recomendar desde la primera búsqueda
+        self.min_recent_games = 1
+    
+    def _check_catalog(self):
+        """Cambia al índice reconstruido (catalog_index.py, ingest.py) sin reiniciar el servidor"""
+        if self.catalog_loader is None or time.monotonic() < self._next_catalog_check:
+            return
+        self._next_catalog_check = time.monotonic() + CATALOG_RELOAD_INTERVAL
+        catalog = self.catalog_loader()
+        if catalog is None or catalog is self._catalog:
+            return
+        # El índice de vecinos se entrena antes de tomar el candado de escritura
+        index = self._index_for(catalog)
+        with self._lock.write():
+            if catalog is self._catalog:
+                return
+            # Los juegos agregados después del índice anterior que no están en el nuevo se conservan
+            own_games = self.game_info.maps[0] if isinstance(self.game_info, ChainMap) else self.game_info
+            added = [game for name, game in own_games.items() if name not in catalog.name_to_row]
+            self._attach_index(catalog, index)
+            self._add_games(added)
+        print(f"Índice de catálogo recargado: {len(catalog)} juegos")
+
+    def catalog_arrays(self):
+        """Matriz normalizada, normas y nombres del catálogo (para exportar un índice)"""
+        with self._lock.read():
+            rows = np.arange(len(self._row_names))
+            dim = len(self.vocabulary)
+            norms = np.linalg.norm(self._store.raw_rows(rows, dim), axis=1).astype(np.float32)
+            return self._store.normalized_rows(rows, dim), norms, list(self._row_names)
+
+    @property
+    def all_genres(self):
+        return set(self.vocabulary.genres)
+
+    @property
+    def all_platforms(self):
+        return set(self.vocabulary.platforms)
+
+    @property
+    def game_vectors(self):
+        """Vista nombre -> vector original (sin normalizar) del catálogo"""
+        with self._lock.read():
+            vectors = self._store.raw_rows(np.arange(len(self._row_names)), len(self.vocabulary))
+            return dict(zip(self._row_names, vectors))
+
+    @property
+    def memory_usage(self):
+        """Bytes ocupados por los vectores del catálogo"""
+        return self._store.nbytes
         
     def _get_year(self, release_date):
         if not release_date or release_date == "Fecha no disponible":
@@ -25,17 +532,11 @@ class GameRecommender:
             return 2000
     
     def _update_feature_sets(self, games_data):
-        """Actualiza los conjuntos de géneros y plataformas"""
-        for game in games_data:
-            self.all_genres.update(game.get("genres", []))
-            self.all_platforms.update(game.get("platforms", []))
+        """Agrega al vocabulario los géneros y plataformas nuevos; devuelve cuántas columnas se agregaron"""
+        return sum(self.vocabulary.add_game(game) for game in games_data)
     
-    def _create_game_vector(self, game):
-        """Crea un vector de características para un juego"""
-        # Extraer características
-        genres = set(game.get("genres", []))
-        platforms = set(game.get("platforms", []))
-        
+    def _numeric_features(self, game):
+        """Rating y año normalizados de un juego"""
         try:
             rating = float(game.get("rating", 0.0))
         except (ValueError, TypeError):
@@ -46,130 +547,260 @@ class GameRecommender:
         except (ValueError, TypeError):
             year = 2000.0
         
-        # Crear vector de características con dimensión fija
-        features = []
+        return (
+            rating / 5.0,  # Normalizar rating a [0,1]
+            (year - 1990) / 40.0  # Normalizar año a [0,1] aproximadamente
+        )
+    
+    def _create_game_vector(self, game):
+        """Crea un vector de características para un juego"""
+        features = np.zeros(len(self.vocabulary), dtype=np.float32)
+        features[:FeatureVocabulary.NUMERIC_COLUMNS] = self._numeric_features(game)
+        features[self.vocabulary.columns(game)] = 1.0
+        return features
+
+    def _append_rows(self, games):
+        """Codifica y agrega juegos al final del almacenamiento"""
+        if not games:
+            return
+        encoded_rows = [
+            (self.vocabulary.columns(game), self._numeric_features(game))
+            for game in games
+        ]
+        first_row = len(self._row_names)
+        self._store.append(encoded_rows, len(self.vocabulary))
+        for game in games:
+            self._name_to_row[game["name"]] = len(self._row_names)
+            self.facets.add(len(self._row_names), game)
+            self._row_names.append(game["name"])
         
-        # Agregar géneros (one-hot encoding)
-        features.extend([1.0 if g in genres else 0.0 for g in sorted(self.all_genres)])
+        # Mantener el índice aproximado al día con las filas nuevas
+        if self.index.needs_training(len(self._row_names)):
+            self.index.train(self._fetch_normalized_rows, len(self._row_names))
+        else:
+            self.index.add(np.arange(first_row, len(self._row_names)), self._fetch_normalized_rows)
+    
+    def _fetch_normalized_rows(self, rows):
+        return self._store.normalized_rows(rows, len(self.vocabulary))
+
+    @traced("recommender.update_model")
+    def update_model(self, games_data):
+        """Actualiza el modelo con nuevos juegos y devuelve el costo de la actualización"""
+        start = time.perf_counter()
+        self._check_catalog()
         
-        # Agregar plataformas (one-hot encoding)
-        features.extend([1.0 if p in platforms else 0.0 for p in sorted(self.all_platforms)])
+        # Los juegos que ya están en el catálogo (lo habitual) solo necesitan el candado de lectura
+        with self._lock.read():
+            pending = [game for game in games_data or [] if game["name"] not in self.game_info]
         
-        # Agregar rating y año normalizados
-        features.extend([
-            rating / 5.0,  # Normalizar rating a [0,1]
-            (year - 1990) / 40.0  # Normalizar año a [0,1] aproximadamente
-        ])
+        new_games = []
+        new_columns = 0
+        if pending:
+            with self._lock.write():
+                new_games, new_columns = self._add_games(pending)
         
-        return np.array(features, dtype=np.float32)
+        self.last_update_stats = {
+            "new_games": len(new_games),
+            "new_columns": new_columns,
+            "total_games": len(self._row_names),
+            "dimension": len(self.vocabulary),
+            "elapsed_ms": (time.perf_counter() - start) * 1000.0,
+        }
+        return self.last_update_stats
     
-    def _rebuild_all_vectors(self):
-        """Reconstruye todos los vectores de juegos para mantener dimensiones consistentes"""
-        old_vectors = self.game_vectors
-        self.game_vectors = {}
-        for game_name, game_info in self.game_info.items():
-            self.game_vectors[game_name] = self._create_game_vector(game_info)
+    def _add_games(self, games):
+        """Agrega los juegos que no estén; devuelve (juegos nuevos, columnas nuevas). Requiere el candado de escritura"""
+        # Solo los juegos que no están en el catálogo generan filas nuevas
+        new_games = []
+        for game in games:
+            if game["name"] not in self.game_info:
+                self.game_info[game["name"]] = game
+                new_games.append(game)
+        
+        # Las características nuevas se agregan como columnas; las filas existentes
+        # no se recalculan porque su valor en esas columnas es cero
+        new_columns = self._update_feature_sets(new_games)
+        self._append_rows(new_games)
+        return new_games, new_columns
     
-    def update_model(self, games_data):
-        """Actualiza el modelo con nuevos juegos"""
-        if not games_data:
+    def _sync_profile(self, profile):
+        """Recalcula el vector del perfil si el catálogo cambió de índice. Requiere un candado"""
+        if profile.generation == self.generation:
             return
-            
-        # Actualizar conjuntos de características
-        old_genre_size = len(self.all_genres)
-        old_platform_size = len(self.all_platforms)
+        rows = [self._name_to_row[name] for name in profile.seen if name in self._name_to_row]
+        profile.vector = np.zeros(0, dtype=np.float32)
+        if rows:
+            profile.vector = self._store.raw_rows(rows, len(self.vocabulary)).sum(axis=0).astype(np.float32)
+        profile.generation = self.generation
+    
+    def observe(self, profile, games):
+        """Agrega los juegos al catálogo compartido y los que sean nuevos para la sesión a su perfil"""
+        self.update_model(games)
+        with self._lock.read():
+            self._sync_profile(profile)
+            rows = {
+                game["name"]: self._name_to_row[game["name"]]
+                for game in games
+                if game["name"] not in profile.seen and game["name"] in self._name_to_row
+            }
+            if not rows:
+                return
+            vectors = self._store.raw_rows(list(rows.values()), len(self.vocabulary))
+        profile.add(list(rows), vectors)
+
+    @staticmethod
+    def _top_k(scores, k):
+        """Índices de los k mayores puntajes, ordenados de mayor a menor"""
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        return top[np.argsort(-scores[top], kind="stable")]
+    
+    def _rows_for(self, games):
+        """Filas (ordenadas y sin repetir) de los juegos que están en el catálogo"""
+        return sorted({
+            self._name_to_row[game["name"]]
+            for game in games
+            if game["name"] in self._name_to_row
+        })
+    
+    def _profile_query(self, rows):
+        """Vector consulta normalizado: promedio de los vectores originales de las filas"""
+        user_profile = self._store.raw_rows(rows, len(self.vocabulary)).mean(axis=0)
+        profile_norm = np.linalg.norm(user_profile)
+        return user_profile / profile_norm if profile_norm > 0 else user_profile
+    
+    def _search(self, query, exclude_rows, k, exact=False):
+        """Top k filas (fila, similitud) más parecidas a la consulta, excluyendo `exclude_rows`"""
+        n = len(self._row_names)
+        dim = len(self.vocabulary)
+        k = min(k, n - len(exclude_rows))
+        if k <= 0:
+            return []
         
-        self._update_feature_sets(games_data)
+        # Con el índice aproximado solo se puntúan las filas candidatas;
+        # si no hay suficientes candidatas se cae a la búsqueda exacta
+        candidates = None if exact else self.index.candidates(query)
+        if candidates is not None:
+            candidates = candidates[~np.isin(candidates, exclude_rows)]
+            if len(candidates) >= k:
+                scores = self._store.row_scores(candidates, query, dim)
+                return [
+                    (int(candidates[i]), float(scores[i]))
+                    for i in self._top_k(scores, k)
+                ]
         
-        # Si hay nuevas características, reconstruir todos los vectores
-        if len(self.all_genres) != old_genre_size or len(self.all_platforms) != old_platform_size:
-            self._rebuild_all_vectors()
+        # Similitud coseno con todo el catálogo en un solo producto matriz-vector
+        scores = self._store.scores(query, dim)
+        scores[exclude_rows] = -np.inf
         
-        # Crear o actualizar vectores de juegos nuevos
-        for game in games_data:
-            if game["name"] not in self.game_vectors:
-                self.game_info[game["name"]] = game
-                self.game_vectors[game["name"]] = self._create_game_vector(game)
+        # Top N con argpartition en lugar de ordenar todo el catálogo
+        return [(int(row), float(scores[row])) for row in self._top_k(scores, k)]
     
+    def measure_recall(self, recent_game_lists, k=10):
+        """Recall@k del índice aproximado frente a la búsqueda exacta y latencia de ambas"""
+        recalls = []
+        exact_seconds = 0.0
+        approx_seconds = 0.0
+        with self._lock.read():
+            for recent_games in recent_game_lists:
+                rows = self._rows_for(recent_games)
+                if not rows:
+                    continue
+                query = self._profile_query(rows)
+                
+                start = time.perf_counter()
+                exact = {row for row, _ in self._search(query, rows, k, exact=True)}
+                exact_seconds += time.perf_counter() - start
+                
+                start = time.perf_counter()
+                approx = {row for row, _ in self._search(query, rows, k)}
+                approx_seconds += time.perf_counter() - start
+                
+                if exact:
+                    recalls.append(len(exact & approx) / len(exact))
+        
+        queries = max(len(recalls), 1)
+        return {
+            "recall": float(np.mean(recalls)) if recalls else 0.0,
+            "queries": len(recalls),
+            "exact_ms": exact_seconds * 1000.0 / queries,
+            "approx_ms": approx_seconds * 1000.0 / queries,
+        }
+    
+    @traced("recommender.get_recommendations")
     def get_recommendations(self, recent_games, num_recommendations=3):
         """Obtiene recomendaciones basadas en similitud de vectores"""
-        if not recent_games or len(recent_games) < 2:  # Requerir al menos 2 juegos
+        if not recent_games or len(recent_games) < self.min_recent_games:
             return []
         
         # Actualizar modelo con juegos recientes
         self.update_model(recent_games)
         
-        # Obtener vector promedio de los juegos recientes
-        recent_vectors = []
-        for game in recent_games:
-            if game["name"] in self.game_vectors:
-                recent_vectors.append(self.game_vectors[game["name"]])
-        
-        if not recent_vectors:
+        with self._lock.read():
+            # Filas de los juegos recientes (se excluyen de las recomendaciones)
+            recent_rows = self._rows_for(recent_games)
+            
+            if not recent_rows:
+                return []
+            
+            matches = self._search(self._profile_query(recent_rows), recent_rows, num_recommendations)
+            return self._recommendations(matches)
+    
+    @traced("recommender.recommend")
+    def recommend(self, profile, num_recommendations=3):
+        """Recomendaciones para el perfil de una sesión (excluye los juegos que ya vio)"""
+        if len(profile) < self.min_recent_games:
             return []
-        
-        # Todos los vectores deberían tener la misma dimensión ahora
-        user_profile = np.mean(recent_vectors, axis=0)
-        
-        # Calcular similitud con todos los juegos
-        similarities = {}
-        for game_name, vector in self.game_vectors.items():
-            if game_name not in [g["name"] for g in recent_games]:
-                similarity = cosine_similarity(
-                    user_profile.reshape(1, -1),
-                    vector.reshape(1, -1)
-                )[0][0]
-                similarities[game_name] = similarity
-        
-        # Ordenar por similitud y obtener los top N
-        recommended_games = sorted(
-            similarities.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:num_recommendations]
-        
-        # Convertir a lista de diccionarios con información completa
+        self._check_catalog()
+        with self._lock.read():
+            self._sync_profile(profile)
+            seen_rows = sorted(self._name_to_row[name] for name in profile.seen if name in self._name_to_row)
+            if not seen_rows:
+                return []
+            matches = self._search(profile.query(len(self.vocabulary)), seen_rows, num_recommendations)
+            return self._recommendations(matches)
+    
+    def _recommendations(self, matches):
+        """Datos completos (copiados) de las filas recomendadas con su similitud"""
         recommendations = []
-        for game_name, similarity in recommended_games:
-            game_info = self.game_info[game_name].copy()
+        for row, similarity in matches:
+            game_info = self.game_info[self._row_names[row]].copy()
             game_info["similarity"] = f"{similarity:.0%}"
             recommendations.append(game_info)
-        
         return recommendations
 
-    def filter_games_by_category(self, category, min_rating=4.0):
-        """Filtra juegos por categoría y rating mínimo"""
-        filtered_games = []
-        for game_name, game_info in self.game_info.items():
-            if category in game_info.get("genres", []) and float(game_info.get("rating", 0.0)) >= min_rating:
-                filtered_games.append({
+    @traced("recommender.find_games")
+    def find_games(self, genre=None, platform=None, year=None, min_rating=None, limit=None):
+        """Juegos del catálogo que cumplen los filtros, de mayor a menor rating (sin recorrer el catálogo)"""
+        self._check_catalog()
+        games = []
+        with self._lock.read():
+            for row in self.facets.query(genre, platform, year, min_rating, limit):
+                game_name = self._row_names[row]
+                game_info = self.game_info[game_name]
+                games.append({
                     "name": game_name,
                     "rating": game_info.get("rating", "Sin calificación"),
                     "genres": game_info.get("genres", []),
                     "platforms": game_info.get("platforms", []),
                     "released": game_info.get("released", "Fecha no disponible")
                 })
-        return sorted(filtered_games, key=lambda x: float(x["rating"]), reverse=True)
+        return games
+
+    def filter_games_by_category(self, category, min_rating=4.0):
+        """Filtra juegos por categoría y rating mínimo"""
+        return self.find_games(genre=category, min_rating=min_rating)
 
     def get_recommendations_by_category(self, category, num_recommendations=5):
         """Obtiene recomendaciones de juegos por categoría con buen rating"""
-        # Primero filtramos los juegos por la categoría deseada
-        filtered_games = self.filter_games_by_category(category)
+        # Los mejores juegos de la categoría (ya están en el catálogo, no hace falta update_model)
+        base_games = self.find_games(genre=category, min_rating=4.0, limit=3)
         
         # Si no hay juegos en la categoría, retornamos una lista vacía
-        if not filtered_games:
+        if not base_games:
             return []
-            
-        # Convertimos los juegos filtrados a un formato adecuado para el modelo
-        games_data = [{"name": game["name"], "genres": game["genres"], 
-                      "rating": game["rating"], "released": game["released"]}
-                     for game in filtered_games]
-        
-        # Actualizamos el modelo con los juegos filtrados
-        self.update_model(games_data)
-        
-        # Tomamos los primeros juegos de la categoría como base para las recomendaciones
-        base_games = filtered_games[:3]
         
         # Obtenemos las recomendaciones basadas en similitud
         recommendations = self.get_recommendations(base_games, num_recommendations)
@@ -0,0 +1,187 @@
+"""Almacén de juegos guardados, indexado por id de RAWG.
+
+Sustituye a data/game_info.json (que se reescribía entero en cada búsqueda) y a
+data/game_info.csv (que acumulaba filas duplicadas). Cada guardado es un upsert
+en SQLite que solo toca la fila del juego, así que su coste no crece con el
+catálogo, y el modo WAL permite que varios procesos lean y escriban a la vez.
+Hay índices secundarios por nombre (sin distinguir mayúsculas) y por fecha de
+lanzamiento.
+
+Los juegos sin id (filas antiguas del CSV) se guardan por nombre y se sustituyen
+cuando llega el mismo juego desde RAWG.
+"""
+import ast
+import csv
+import json
+import os
+import time
+
+from storage import ThreadLocalConnection, game_rating
+
+GAME_STORE_PATH = "data/games.sqlite3"
+LEGACY_JSON_PATH = "data/game_info.json"
+LEGACY_CSV_PATH = "data/game_info.csv"
+
+def parse_platforms(value):
+    """Las filas del CSV guardan las plataformas como lista de Python o separadas por comas"""
+    value = (value or "").strip()
+    if value.startswith("["):
+        try:
+            return [str(p) for p in ast.literal_eval(value)]
+        except (ValueError, SyntaxError):
+            value = value.strip("[]")
+    return [p.strip().strip("'\"") for p in value.split(",") if p.strip()]
+
+def name_key(name):
+    return " ".join(name.lower().split())
+
+def _row_key(game):
+    return str(game["id"]) if game.get("id") is not None else f"name:{name_key(game['name'])}"
+
+def read_legacy_games(json_path=LEGACY_JSON_PATH, csv_path=LEGACY_CSV_PATH):
+    """Juegos de los archivos antiguos sin duplicados por nombre; el JSON tiene prioridad"""
+    games = {}
+    if json_path and os.path.isfile(json_path):
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                for game in json.load(f):
+                    if isinstance(game, dict) and game.get("name"):
+                        # La última versión guardada de cada juego es la más reciente
+                        games[name_key(game["name"])] = game
+        except json.JSONDecodeError as e:
+            print(f"Error al leer {json_path}: {e}")
+    if csv_path and os.path.isfile(csv_path):
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                if row.get("name") and name_key(row["name"]) not in games:
+                    games[name_key(row["name"])] = {
+                        "name": row["name"],
+                        "description": row.get("description") or "",
+                        "released": row.get("release_date") or "Fecha no disponible",
+                        "platforms": parse_platforms(row.get("platforms")),
+                        "genres": [],
+                        "rating": 0
+                    }
+    return list(games.values())
+
+class GameStore:
+    def __init__(self, path=GAME_STORE_PATH, legacy_json=LEGACY_JSON_PATH, legacy_csv=LEGACY_CSV_PATH):
+        self.path = path
+        self._connection = ThreadLocalConnection(path)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " key TEXT PRIMARY KEY,"
+                " id INTEGER,"
+                " name TEXT NOT NULL,"
+                " name_key TEXT NOT NULL,"
+                " released TEXT,"
+                " rating REAL NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS games_id ON games (id) WHERE id IS NOT NULL")
+            conn.execute("CREATE INDEX IF NOT EXISTS games_name ON games (name_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS games_released ON games (released)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        if legacy_json or legacy_csv:
+            self._migrate_legacy_once(legacy_json, legacy_csv)
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def _upsert(self, conn, games):
+        now = time.time()
+        rows = []
+        for game in games:
+            rows.append((
+                _row_key(game), game.get("id"), game["name"], name_key(game["name"]), game.get("released"),
+                game_rating(game), json.dumps(game, ensure_ascii=False), now
+            ))
+        conn.executemany(
+            "INSERT OR REPLACE INTO games (key, id, name, name_key, released, rating, payload, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        # La versión de RAWG sustituye a la fila antigua sin id del mismo juego
+        conn.executemany(
+            "DELETE FROM games WHERE key = ?",
+            [(f"name:{row[3]}",) for row in rows if row[1] is not None]
+        )
+
+    def upsert(self, game):
+        """Inserta o actualiza un juego (una transacción que solo toca su fila)"""
+        self.upsert_many([game])
+
+    def upsert_many(self, games):
+        """Inserta o actualiza varios juegos en una sola transacción"""
+        games = [game for game in games if game.get("name")]
+        if not games:
+            return
+        conn = self._connection()
+        with conn:
+            self._upsert(conn, games)
+
+    def _select(self, where="", params=()):
+        rows = self._connection().execute(f"SELECT payload FROM games {where}", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, game_id):
+        """Juego por id de RAWG (None si no está)"""
+        games = self._select("WHERE id = ?", (game_id,))
+        return games[0] if games else None
+
+    def get_many(self, game_ids):
+        """Juegos guardados de los ids indicados, por id (solo los que están)"""
+        found = {}
+        game_ids = list(game_ids)
+        # SQLite limita el número de parámetros por consulta
+        for start in range(0, len(game_ids), 500):
+            chunk = game_ids[start:start + 500]
+            for game in self._select(f"WHERE id IN ({','.join('?' * len(chunk))})", chunk):
+                found[game["id"]] = game
+        return found
+
+    def find_by_name(self, name):
+        """Juego por nombre sin distinguir mayúsculas; prefiere el que tiene id de RAWG"""
+        games = self._select("WHERE name_key = ? ORDER BY id IS NULL, updated_at DESC LIMIT 1", (name_key(name),))
+        return games[0] if games else None
+
+    def released_between(self, start, end):
+        """Juegos con fecha de lanzamiento (YYYY-MM-DD) entre `start` y `end`, ambos incluidos"""
+        return self._select("WHERE released BETWEEN ? AND ? ORDER BY released", (start, end))
+
+    def ids(self):
+        """Ids de RAWG de todos los juegos guardados"""
+        return {row[0] for row in self._connection().execute("SELECT id FROM games WHERE id IS NOT NULL")}
+
+    def iter_games(self, batch_size=1000):
+        """Todos los juegos en lotes, sin cargar el almacén entero de una vez"""
+        cursor = self._connection().execute("SELECT payload FROM games ORDER BY key")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield json.loads(row[0])
+
+    def all_games(self):
+        return list(self.iter_games())
+
+    def _migrate_legacy_once(self, json_path, csv_path):
+        """Importa data/game_info.json y data/game_info.csv la primera vez que se abre el almacén"""
+        if not any(path and os.path.isfile(path) for path in (json_path, csv_path)):
+            return
+        conn = self._connection()
+        with conn:
+            # Igual que en el caché de traducciones: marca e importación en la misma transacción
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) VALUES ('legacy_files_imported', ?)",
+                (json.dumps([json_path, csv_path]),)
+            ).rowcount
+            if claimed:
+                games = read_legacy_games(json_path, csv_path)
+                # Primero los que no tienen id, para que la versión de RAWG los sustituya
+                self._upsert(conn, sorted(games, key=lambda game: game.get("id") is not None))
+        if claimed:
+            print(f"Almacén de juegos: importados {len(games)} juegos de {json_path} y {csv_path}")
@@ -0,0 +1,231 @@
+"""Ingesta masiva del catálogo para precalentar juegos fuera de horario.
+
+Recorre los listados de RAWG (o un volcado local cuando no hay red), pide los
+detalles con concurrencia acotada, limpia las descripciones igual que la
+aplicación, las traduce en lotes grandes con el perfil "quality" y guarda todo
+en el almacén de juegos (game_store.py) y en el índice del catálogo. Después
+de cada página se guarda un checkpoint, así que una ejecución interrumpida
+continúa donde quedó.
+
+Uso:
+    python ingest.py --pages 250                      # listados de RAWG
+    python ingest.py --fixture volcado.jsonl          # volcado local de /games/{id}
+    python ingest.py --pages 250 --translate-workers 4 --reset
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Cargar .env antes de importar los módulos que leen su configuración del entorno
+load_dotenv()
+
+from catalog_index import build_catalog_index, load_stored_games
+from game_store import GameStore
+from rawg_client import RAWGError, game_info_from_details
+
+CHECKPOINT_PATH = "data/ingest_checkpoint.json"
+STAGES = ["listado", "detalles", "traducción", "guardado"]
+
+def _write_json_atomic(path, data):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def load_checkpoint(source, path=CHECKPOINT_PATH):
+    """Página desde la que continuar para esta fuente (1 si no hay checkpoint)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return 1
+    return checkpoint.get("next_page", 1) if checkpoint.get("source") == source else 1
+
+def save_checkpoint(source, next_page, games, path=CHECKPOINT_PATH):
+    _write_json_atomic(path, {"source": source, "next_page": next_page, "games": games, "updated_at": time.time()})
+
+def read_fixture(path):
+    """Respuestas de /games/{id} guardadas en un .json (lista o {"results": [...]}) o .jsonl"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data.get("results", []) if isinstance(data, dict) else data
+
+class FixtureSource:
+    """Páginas de un volcado local; los detalles ya vienen en el volcado"""
+
+    def __init__(self, path, page_size):
+        self.name = f"fixture:{os.path.abspath(path)}"
+        self.payloads = read_fixture(path)
+        self.page_size = page_size
+
+    def page(self, number):
+        """(detalles de la página, hay más páginas)"""
+        start = (number - 1) * self.page_size
+        return self.payloads[start:start + self.page_size], start + self.page_size < len(self.payloads)
+
+    def details(self, items, known_ids):
+        return [game_info_from_details(payload) for payload in items if payload.get("id") not in known_ids]
+
+class RAWGSource:
+    """Páginas de los listados de RAWG; los detalles se piden en paralelo (y quedan en el caché de RAWG)"""
+
+    def __init__(self, lookup, page_size, fetch_workers, ordering="-added"):
+        self.name = f"rawg:{ordering}"
+        self.lookup = lookup
+        self.page_size = page_size
+        self.ordering = ordering
+        self.executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="ingest-fetch")
+
+    def page(self, number):
+        data = self.lookup.client.get(
+            "list", "games", {"page": number, "page_size": self.page_size, "ordering": self.ordering}
+        )
+        return data.get("results") or [], bool(data.get("next"))
+
+    def details(self, items, known_ids):
+        def fetch(game_id):
+            try:
+                return self.lookup.game_details(game_id)
+            except RAWGError as e:
+                print(f"Error al obtener los detalles del juego {game_id}: {e}")
+                return None
+
+        game_ids = [item["id"] for item in items if item["id"] not in known_ids]
+        return [game for game in self.executor.map(fetch, game_ids) if game is not None]
+
+# Estado de cada proceso de traducción (el modelo se carga una vez por proceso)
+_worker = {}
+
+def _init_translation_worker():
+    from translation_cache import open_translation_cache
+    from translator import load_model
+    _worker["tokenizer"], _worker["model"] = load_model()
+    _worker["cache"] = open_translation_cache()
+
+def _translate_chunk(texts, batch_size):
+    from translator import translate_texts, translation_cache_for
+    if not _worker:
+        _init_translation_worker()
+    translations = translate_texts(
+        texts, _worker["tokenizer"], _worker["model"],
+        max_batch_size=batch_size, cache=_worker["cache"], profile="quality"
+    )
+    # También el texto completo, que es lo primero que busca translate_text en la aplicación
+    translation_cache_for(_worker["cache"], _worker["model"], "quality").set_many(dict(zip(texts, translations)))
+    return translations
+
+class Translator:
+    """Traduce descripciones en lotes grandes, en este proceso o en un pool de procesos"""
+
+    def __init__(self, workers, batch_size, texts_per_task=32):
+        self.batch_size = batch_size
+        self.texts_per_task = texts_per_task
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_translation_worker)
+
+    def translate(self, texts):
+        chunks = [texts[i:i + self.texts_per_task] for i in range(0, len(texts), self.texts_per_task)]
+        if self.pool is None:
+            results = [_translate_chunk(chunk, self.batch_size) for chunk in chunks]
+        else:
+            results = self.pool.map(_translate_chunk, chunks, [self.batch_size] * len(chunks))
+        return [translation for chunk in results for translation in chunk]
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+def run(source, translator, store, max_pages=None, checkpoint_path=CHECKPOINT_PATH, build_index=True):
+    """Ejecuta la ingesta página a página y devuelve los tiempos y conteos por etapa"""
+    known_ids = store.ids()
+    seconds = dict.fromkeys(STAGES, 0.0)
+    counts = dict.fromkeys(STAGES, 0)
+
+    page = load_checkpoint(source.name, checkpoint_path)
+    if page > 1:
+        print(f"Continuando desde la página {page} ({len(known_ids)} juegos guardados)")
+    pages_done = 0
+    has_more = True
+    while has_more and (max_pages is None or pages_done < max_pages):
+        start = time.perf_counter()
+        items, has_more = source.page(page)
+        seconds["listado"] += time.perf_counter() - start
+        counts["listado"] += len(items)
+
+        start = time.perf_counter()
+        games = source.details(items, known_ids)
+        seconds["detalles"] += time.perf_counter() - start
+        counts["detalles"] += len(games)
+
+        start = time.perf_counter()
+        for game, translation in zip(games, translator.translate([game["description"] for game in games])):
+            game["description"] = translation
+        seconds["traducción"] += time.perf_counter() - start
+        counts["traducción"] += len(games)
+
+        start = time.perf_counter()
+        store.upsert_many(games)
+        known_ids.update(game["id"] for game in games)
+        page += 1
+        save_checkpoint(source.name, page, len(known_ids), checkpoint_path)
+        seconds["guardado"] += time.perf_counter() - start
+        counts["guardado"] += len(games)
+
+        pages_done += 1
+        print(f"Página {page - 1}: {len(games)} juegos nuevos, {len(known_ids)} en total")
+
+    if build_index:
+        start = time.perf_counter()
+        total = build_catalog_index(load_stored_games(store))
+        seconds["índice"] = time.perf_counter() - start
+        counts["índice"] = total
+    return seconds, counts
+
+def print_report(seconds, counts):
+    print(f"{'etapa':>12} {'juegos':>8} {'segundos':>10} {'juegos/s':>10}")
+    for stage, elapsed in seconds.items():
+        rate = counts[stage] / elapsed if elapsed > 0 else 0.0
+        print(f"{stage:>12} {counts[stage]:>8} {elapsed:>10.2f} {rate:>10.1f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta masiva del catálogo de juegos")
+    parser.add_argument("--fixture", help="volcado local (.json o .jsonl) en lugar de RAWG")
+    parser.add_argument("--pages", type=int, help="número máximo de páginas en esta ejecución")
+    parser.add_argument("--page-size", type=int, default=40)
+    parser.add_argument("--fetch-workers", type=int, default=8)
+    parser.add_argument("--translate-workers", type=int, default=1)
+    parser.add_argument("--translate-batch", type=int, default=32, help="tamaño de lote de model.generate")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--reset", action="store_true", help="ignorar el checkpoint y empezar desde la página 1")
+    parser.add_argument("--no-index", action="store_true", help="no reconstruir el índice del catálogo")
+    args = parser.parse_args()
+
+    if args.reset and os.path.isfile(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    if args.fixture:
+        source = FixtureSource(args.fixture, args.page_size)
+    else:
+        from rawg_cache import CachedGameLookup, RAWGResponseCache
+        from rawg_client import RAWGClient
+        client = RAWGClient(os.getenv("RAWG_API_KEY"))
+        source = RAWGSource(CachedGameLookup(client, RAWGResponseCache()), args.page_size, args.fetch_workers)
+
+    translator = Translator(args.translate_workers, args.translate_batch)
+    try:
+        seconds, counts = run(source, translator, GameStore(), args.pages, args.checkpoint,
+                              build_index=not args.no_index)
+    finally:
+        translator.close()
+    print_report(seconds, counts)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Caché persistente de resultados de OCR por contenido de la imagen.
+
+La clave es el hash SHA-256 de los bytes subidos (antes del preprocesado) junto
+con los idiomas pedidos, así que volver a subir la misma portada no repite ni el
+preprocesado ni la llamada a OCR.space. También se guarda el texto vacío (la
+imagen no tiene texto); los errores de la API no se guardan.
+"""
+import hashlib
+import os
+import time
+
+from storage import ThreadLocalConnection
+
+OCR_CACHE_PATH = "cache/ocr.sqlite3"
+
+def image_key(image_data, languages):
+    """Clave de caché de una imagen y los idiomas con los que se procesa"""
+    digest = hashlib.sha256(image_data).hexdigest()
+    return f"{digest}:{','.join(languages)}"
+
+class OCRResultCache:
+    def __init__(self, path=OCR_CACHE_PATH):
+        self.path = path
+        self._connection = ThreadLocalConnection(path)
+        self.hits = 0
+        self.misses = 0
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_results ("
+                " key TEXT PRIMARY KEY, text TEXT NOT NULL, language TEXT, created_at REAL NOT NULL)"
+            )
+
+    def get(self, key):
+        """Texto guardado para la clave (None si no está)"""
+        row = self._connection().execute("SELECT text FROM ocr_results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key, text, language=None):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_results (key, text, language, created_at) VALUES (?, ?, ?, ?)",
+                (key, text, language, time.time())
+            )
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,212 @@
+"""Cliente de OCR.space con caché por contenido, idiomas en paralelo y salud por clave.
+
+Para cada clave se piden a la vez todos los idiomas y se devuelve el primer
+resultado con texto. Cada clave tiene un circuit breaker: los errores de cuota
+(403, 429 o mensajes de límite de OCR.space) la abren de inmediato y los errores
+transitorios tras `failure_threshold` fallos seguidos; mientras está abierta la
+clave se salta, y pasado `cooldown` se vuelve a probar con una sola petición.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ocr_cache import image_key
+from tracing import span
+
+OCR_SPACE_URL = os.getenv("OCR_SPACE_URL", "https://api.ocr.space/parse/image")
+OCR_LANGUAGES = ("spa", "eng")  # Se piden a la vez; gana la primera respuesta con texto
+OCR_TIMEOUT = float(os.getenv("OCR_TIMEOUT", "30"))
+OCR_KEY_COOLDOWN = float(os.getenv("OCR_KEY_COOLDOWN", "600"))
+
+QUOTA_STATUS = {401, 403, 429}
+QUOTA_MESSAGES = ("maximum", "exceeded", "limit", "invalid api key")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class OCRError(Exception):
+    """Ninguna clave de OCR.space pudo procesar la imagen"""
+
+class KeyFailure(Exception):
+    """La clave falló; `quota` indica que está agotada o no es válida"""
+
+    def __init__(self, message, quota=False):
+        super().__init__(message)
+        self.quota = quota
+
+class KeyHealth:
+    """Circuit breaker de una clave de API"""
+
+    def __init__(self, failure_threshold=3, cooldown=OCR_KEY_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Si se puede usar la clave ahora (pasado el cooldown deja pasar una prueba)"""
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                return True
+            return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.requests += 1
+            self.state = CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self, quota=False):
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            if quota or self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def to_dict(self):
+        with self._lock:
+            return {"state": self.state, "requests": self.requests, "failures": self.failures}
+
+def parse_ocr_response(response):
+    """Texto de la respuesta de OCR.space ("" si no hay texto); lanza KeyFailure si la clave falló"""
+    if response.status_code in QUOTA_STATUS:
+        raise KeyFailure(f"OCR.space respondió {response.status_code}", quota=True)
+    if response.status_code != 200:
+        raise KeyFailure(f"Error en la API (HTTP {response.status_code}): {response.text[:200]}")
+    try:
+        result = response.json()
+    except ValueError:
+        raise KeyFailure(f"Respuesta no válida de OCR.space: {response.text[:200]}")
+    if isinstance(result, str):
+        # OCR.space devuelve una cadena cuando se supera el límite de peticiones
+        raise KeyFailure(result, quota=any(word in result.lower() for word in QUOTA_MESSAGES))
+    if not isinstance(result, dict):
+        raise KeyFailure(f"Respuesta no válida de OCR.space: {result}")
+
+    parsed_results = result.get("ParsedResults")
+    if result.get("IsErroredOnProcessing") and not parsed_results:
+        message = result.get("ErrorMessage") or "Error al procesar la imagen"
+        message = " ".join(message) if isinstance(message, list) else str(message)
+        raise KeyFailure(message, quota=any(word in message.lower() for word in QUOTA_MESSAGES))
+    if not parsed_results or not isinstance(parsed_results, list):
+        return ""
+    return (parsed_results[0].get("ParsedText") or "").replace("\r\n", " ").replace("\n", " ").strip()
+
+class OCRSpaceClient:
+    def __init__(self, api_keys, cache=None, url=OCR_SPACE_URL, languages=OCR_LANGUAGES,
+                 timeout=OCR_TIMEOUT, failure_threshold=3, cooldown=OCR_KEY_COOLDOWN):
+        self.api_keys = list(api_keys)
+        self.cache = cache
+        self.url = url
+        self.languages = tuple(languages)
+        self.timeout = timeout
+        self.health = {key: KeyHealth(failure_threshold, cooldown) for key in self.api_keys}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4 * len(self.languages))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=4 * len(self.languages), thread_name_prefix="ocr"
+        )
+
+    def _request(self, api_key, language, image_data):
+        try:
+            response = self.session.post(
+                self.url,
+                # Los bytes se envían completos en cada petición (un BytesIO ya leído enviaría un cuerpo vacío)
+                files={"image": ("image.jpg", image_data, "image/jpeg")},
+                data={
+                    "apikey": api_key,
+                    "language": language,
+                    "isOverlayRequired": False,
+                    "filetype": "JPG",
+                    "OCREngine": 2
+                },
+                headers={"User-Agent": "Mozilla/5.0"},
+                timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            # También ChunkedEncodingError, SSLError, etc.: la clave debe quedar como fallida
+            raise KeyFailure(f"Error de conexión con OCR.space: {e}")
+        return parse_ocr_response(response)
+
+    def _try_key(self, api_key, image_data):
+        """(texto, idioma) con la primera respuesta que tenga texto; ("", None) si ninguna tiene"""
+        futures = {
+            self._executor.submit(self._request, api_key, language, image_data): language
+            for language in self.languages
+        }
+        pending = set(futures)
+        failure = None
+        answered = False
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    text = future.result()
+                except KeyFailure as e:
+                    failure = failure if failure and failure.quota else e
+                    continue
+                answered = True
+                if text:
+                    for other in pending:
+                        other.cancel()
+                    self.health[api_key].record_success()
+                    return text, futures[future]
+        if answered:
+            self.health[api_key].record_success()
+            return "", None
+        self.health[api_key].record_failure(quota=failure.quota)
+        raise failure
+
+    def extract_text(self, image_data, preprocess=None):
+        """Texto de la imagen ("" si no tiene); lanza OCRError si ninguna clave responde.
+
+        `preprocess` recibe los bytes originales y devuelve los que se envían
+        (o None si no se pudo procesar); solo se llama si el resultado no está en caché.
+        """
+        key = image_key(image_data, self.languages)
+        if self.cache is not None:
+            with span("ocr.cache_lookup"):
+                cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        with span("ocr.preprocess"):
+            upload = preprocess(image_data) if preprocess else image_data
+        if upload is None:
+            raise OCRError("No se pudo procesar la imagen.")
+
+        for api_key in self.api_keys:
+            if not self.health[api_key].allow():
+                continue
+            try:
+                with span("ocr.request"):
+                    text, language = self._try_key(api_key, upload)
+            except KeyFailure as e:
+                print(f"La clave API {api_key[:5]}... falló ({e}).")  # Mostrar solo parte de la clave
+                continue
+            if self.cache is not None:
+                self.cache.set(key, text, language)
+            return text
+        raise OCRError("Todas las claves API fallaron o se agotaron.")
+
+    def key_stats(self):
+        """Estado del circuit breaker y contadores de cada clave (abreviada)"""
+        return {f"{api_key[:5]}...": health.to_dict() for api_key, health in self.health.items()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
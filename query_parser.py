@@ -0,0 +1,44 @@
+"""Normalización de consultas compartida por interpret_query y word_filter.
+
+Cada consulta se tokeniza una sola vez (solo el tokenizador de spaCy, sin los
+componentes estadísticos) y el resultado se memoriza en un LRU acotado cuya
+clave es la consulta normalizada.
+"""
+import os
+from functools import lru_cache
+
+from resources import get_resource
+from tracing import traced
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "4096"))
+
+# Palabras que no aportan valor para los filtros (palabras basura)
+STOP_WORDS = frozenset({
+    "todos", "juegos", "dame", "quiero", "información", "podrías", "darme", "consultar", "de", "en",
+    "sobre", "para", "con", "y", "la", "el", "los", "las", "un", "una", "que", "quisiera", "saber",
+    "hablame", "acerca", "del", "alrededor"
+})
+
+def normalize_query(user_query):
+    """Convierte la consulta (texto o tupla) a minúsculas con los espacios normalizados"""
+    # Si user_query es una tupla, convertirla en una cadena
+    if isinstance(user_query, tuple):
+        user_query = " ".join(user_query)
+    return " ".join(str(user_query).lower().split())
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _relevant_words(normalized_query):
+    tokenizer = get_resource("query_tokenizer")
+    return tuple(
+        token.text for token in tokenizer(normalized_query)
+        if token.text not in STOP_WORDS and not token.is_punct
+    )
+
+@traced("query.parse")
+def query_words(user_query):
+    """Palabras relevantes de la consulta (sin palabras vacías ni puntuación)"""
+    return _relevant_words(normalize_query(user_query))
+
+def query_cache_info():
+    """Aciertos, fallos y tamaño del LRU de consultas"""
+    return _relevant_words.cache_info()
@@ -0,0 +1,193 @@
+"""Caché persistente de respuestas de RAWG con TTL y stale-while-revalidate.
+
+Guarda dos tablas en SQLite:
+    - searches: consulta normalizada -> ids de los resultados de RAWG (el primero va aparte)
+    - games: id -> datos del juego ya limpios (game_info_from_details, sin traducir)
+
+Una entrada más nueva que `ttl` es fresca. Entre `ttl` y `ttl + stale_ttl` se
+sirve igual (stale) y se refresca en segundo plano; después se considera ausente.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from rawg_client import game_info_from_details
+from storage import ThreadLocalConnection
+from tracing import span
+
+RAWG_CACHE_PATH = "cache/rawg.sqlite3"
+RAWG_CACHE_TTL = float(os.getenv("RAWG_CACHE_TTL", str(24 * 3600)))
+RAWG_CACHE_STALE_TTL = float(os.getenv("RAWG_CACHE_STALE_TTL", str(7 * 24 * 3600)))
+# Peticiones de detalles simultáneas (compartidas por todas las sesiones)
+RAWG_FETCH_WORKERS = int(os.getenv("RAWG_FETCH_WORKERS", "5"))
+
+FRESH = "fresh"
+STALE = "stale"
+MISS = "miss"
+
+class RAWGResponseCache:
+    def __init__(self, path=RAWG_CACHE_PATH, ttl=RAWG_CACHE_TTL, stale_ttl=RAWG_CACHE_STALE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._connection = ThreadLocalConnection(path)
+        self._counters = {}
+        self._counters_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS searches ("
+                " query TEXT PRIMARY KEY, game_id INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+            )
+            # Cachés creados antes de guardar todos los resultados de la búsqueda
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(searches)")}
+            if "hit_ids" not in columns:
+                conn.execute("ALTER TABLE searches ADD COLUMN hit_ids TEXT")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS games ("
+                " id INTEGER PRIMARY KEY, payload TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def _state(self, fetched_at):
+        age = time.time() - fetched_at
+        if age <= self.ttl:
+            return FRESH
+        if age <= self.ttl + self.stale_ttl:
+            return STALE
+        return MISS
+
+    def _count(self, table, state):
+        with self._counters_lock:
+            key = f"{table}_{state}"
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def _get(self, table, sql, key):
+        """Fila sin la columna fetched_at (la última) y su estado"""
+        row = self._connection().execute(sql, (key,)).fetchone()
+        state = self._state(row[-1]) if row else MISS
+        self._count(table, state)
+        return (row[:-1] if state != MISS else None), state
+
+    def get_search(self, query):
+        """(ids de los resultados, estado) para una consulta normalizada"""
+        row, state = self._get(
+            "searches", "SELECT game_id, hit_ids, fetched_at FROM searches WHERE query = ?", query
+        )
+        if row is None:
+            return None, state
+        game_id, hit_ids = row
+        return (json.loads(hit_ids) if hit_ids else [game_id]), state
+
+    def set_search(self, query, game_ids):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO searches (query, game_id, hit_ids, fetched_at) VALUES (?, ?, ?, ?)",
+                (query, game_ids[0], json.dumps(game_ids), time.time())
+            )
+
+    def get_game(self, game_id):
+        """(datos del juego, estado) para un id de RAWG"""
+        row, state = self._get("games", "SELECT payload, fetched_at FROM games WHERE id = ?", game_id)
+        return (json.loads(row[0]) if row is not None else None), state
+
+    def set_game(self, game_info):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO games (id, payload, fetched_at) VALUES (?, ?, ?)",
+                (game_info["id"], json.dumps(game_info, ensure_ascii=False), time.time())
+            )
+
+    def stats(self):
+        """Aciertos (frescos y stale) y fallos por tabla"""
+        with self._counters_lock:
+            return dict(self._counters)
+
+class CachedGameLookup:
+    """Búsqueda y detalles de RAWG pasando por el caché; refresca en segundo plano lo stale"""
+
+    def __init__(self, client, cache, refresh_workers=2, fetch_workers=RAWG_FETCH_WORKERS):
+        self.client = client
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="rawg-refresh")
+        self._fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers, thread_name_prefix="rawg-fetch")
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+
+    def _refresh_in_background(self, key, refresh):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                print(f"Error al refrescar {key} desde RAWG: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def _search(self, query):
+        with span("rawg.search_request"):
+            data = self.client.search(query, page_size=5)
+        game_ids = [game["id"] for game in data.get("results") or []]
+        if data["count"] == 0 or not game_ids:
+            return []
+        self.cache.set_search(query, game_ids)
+        return game_ids
+
+    def _details(self, game_id):
+        with span("rawg.details_request"):
+            game_details = self.client.game_details(game_id)
+        with span("rawg.clean_html"):
+            game_info = game_info_from_details(game_details)
+        self.cache.set_game(game_info)
+        return game_info
+
+    def find_game_ids(self, query):
+        """Ids de los resultados de RAWG para la consulta normalizada, en orden (vacía si no hay)"""
+        game_ids, state = self.cache.get_search(query)
+        if state == STALE:
+            self._refresh_in_background(("search", query), lambda: self._search(query))
+        if game_ids is not None:
+            return game_ids
+        return self._search(query)
+
+    def find_game_id(self, query):
+        """Id del primer resultado de RAWG para la consulta normalizada (None si no hay)"""
+        game_ids = self.find_game_ids(query)
+        return game_ids[0] if game_ids else None
+
+    def game_details(self, game_id):
+        """Datos limpios del juego (descripción sin traducir)"""
+        game_info, state = self.cache.get_game(game_id)
+        if state == STALE:
+            self._refresh_in_background(("details", game_id), lambda: self._details(game_id))
+        if game_info is not None:
+            return game_info
+        return self._details(game_id)
+
+    def game_details_many(self, game_ids, extra_timeout=0.5):
+        """Detalles del primer juego y de los demás resultados, pedidos en paralelo.
+
+        El primero se pide en el hilo que llama (sus errores se propagan), así no
+        espera detrás de los adicionales de otras sesiones en el pool compartido.
+        Los demás se esperan como mucho `extra_timeout` segundos más; los que no
+        lleguen a tiempo o fallen se omiten, aunque los que terminen después
+        quedan igualmente en el caché.
+        """
+        futures = [self._fetch_executor.submit(self.game_details, game_id) for game_id in game_ids[1:]]
+        game_info = self.game_details(game_ids[0])
+
+        wait(futures, timeout=extra_timeout)
+        extras = []
+        for future in futures:
+            if future.done() and future.exception() is None:
+                extras.append(future.result())
+            elif future.done():
+                print(f"Error al obtener detalles adicionales de RAWG: {future.exception()}")
+        return game_info, extras
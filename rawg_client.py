@@ -0,0 +1,187 @@
+"""Cliente HTTP de RAWG.io con conexiones persistentes, reintentos y métricas por endpoint.
+
+Una sola instancia por proceso (ver resources.py) reutiliza las conexiones TLS
+entre sesiones. Los errores de red, los 5xx y los 429 se reintentan con espera
+exponencial con jitter; si RAWG envía Retry-After se respeta ese tiempo.
+"""
+import html
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RAWG_BASE_URL = os.getenv("RAWG_BASE_URL", "https://api.rawg.io/api")
+CONNECT_TIMEOUT = float(os.getenv("RAWG_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("RAWG_READ_TIMEOUT", "10"))
+MAX_RETRIES = int(os.getenv("RAWG_MAX_RETRIES", "3"))
+# Tiempo máximo que una petición puede pasar esperando entre reintentos
+RETRY_BUDGET = float(os.getenv("RAWG_RETRY_BUDGET", "10"))
+
+# Códigos que vale la pena reintentar
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+class RAWGError(Exception):
+    """La petición a RAWG falló después de los reintentos"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class EndpointStats:
+    """Latencias recientes y contadores de un endpoint"""
+
+    def __init__(self, window=1000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+        }
+
+def clean_description(description):
+    """Convierte la descripción HTML de RAWG en texto plano con párrafos separados por líneas"""
+    description = re.sub(r'<br\s*/?>|<p>|</p>', '\n', description)  # Reemplazar <br/>, <p> con saltos de línea
+    description = re.sub(r'<[^>]+>', '', description)  # Eliminar otras etiquetas HTML
+    description = html.unescape(description)  # Convertir entidades HTML
+    description = re.sub(r'\n\s*\n', '\n\n', description)  # Eliminar líneas vacías múltiples
+    return description.strip()  # Eliminar espacios en blanco al inicio y final
+
+def game_info_from_details(game_details):
+    """Datos del juego a partir de la respuesta de /games/{id} (descripción sin traducir)"""
+    return {
+        "id": game_details["id"],
+        "name": game_details.get("name", "Nombre no disponible"),
+        "description": clean_description(game_details.get("description") or "No hay descripción disponible."),
+        "rating": game_details.get("rating", 0),
+        "rating_count": game_details.get("ratings_count", 0),
+        "released": game_details.get("released", "Fecha no disponible"),
+        "platforms": [p["platform"]["name"] for p in game_details.get("platforms") or []],
+        "genres": [g["name"] for g in game_details.get("genres") or []],
+        "developers": [d["name"] for d in game_details.get("developers") or []],
+        "publishers": [p["name"] for p in game_details.get("publishers") or []],
+        "background_image": game_details.get("background_image", ""),
+        "metacritic": game_details.get("metacritic", None),
+        "esrb_rating": (game_details.get("esrb_rating") or {}).get("name", None)
+    }
+
+def _retry_after_seconds(response):
+    """Segundos indicados en Retry-After (número o fecha HTTP); None si no viene"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class RAWGClient:
+    def __init__(self, api_key, base_url=RAWG_BASE_URL, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, max_retries=MAX_RETRIES, backoff=0.5,
+                 max_backoff=8.0, retry_budget=RETRY_BUDGET, pool_size=16):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_budget = retry_budget
+        self.session = requests.Session()
+        # Los reintentos los maneja el cliente para poder medirlos y respetar Retry-After
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+
+    def _endpoint_stats(self, endpoint):
+        with self._stats_lock:
+            return self._stats.setdefault(endpoint, EndpointStats())
+
+    def _retry_delay(self, attempt, response=None):
+        """Espera antes de reintentar: Retry-After completo si existe, si no backoff exponencial con jitter"""
+        delay = _retry_after_seconds(response) if response is not None else None
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        return delay
+
+    def get(self, endpoint, path, params=None):
+        """GET a la API con reintentos; devuelve el JSON o lanza RAWGError"""
+        stats = self._endpoint_stats(endpoint)
+        params = dict(params or {}, key=self.api_key)
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        deadline = time.monotonic() + self.retry_budget
+        unmet_wait = None
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            with self._stats_lock:
+                stats.requests += 1
+                stats.latencies.append((time.perf_counter() - start) * 1000.0)
+
+            if response is not None and response.status_code == 200:
+                return response.json()
+            retryable = response is None or response.status_code in RETRY_STATUS
+            if not retryable or attempt == self.max_retries:
+                break
+            # Si no queda tiempo para esperar todo lo que pide RAWG, se falla ya en lugar de reintentar antes
+            wait = self._retry_delay(attempt, response)
+            if wait > deadline - time.monotonic():
+                unmet_wait = wait
+                break
+            with self._stats_lock:
+                stats.retries += 1
+            time.sleep(wait)
+
+        with self._stats_lock:
+            stats.failures += 1
+        if response is None:
+            raise RAWGError(f"Error de conexión con RAWG: {error}")
+        if unmet_wait is not None:
+            raise RAWGError(f"RAWG respondió {response.status_code} y pide esperar {unmet_wait:.0f} s",
+                            response.status_code)
+        raise RAWGError(f"RAWG respondió {response.status_code}", response.status_code)
+
+    def search(self, query, page_size=5):
+        """Busca juegos por nombre"""
+        return self.get("search", "games", {"search": query, "page_size": page_size})
+
+    def game_details(self, game_id):
+        """Detalles completos de un juego"""
+        return self.get("details", f"games/{game_id}")
+
+    def stats(self):
+        """Métricas por endpoint: peticiones, reintentos, fallos y latencias p50/p95/p99"""
+        with self._stats_lock:
+            return {endpoint: stats.to_dict() for endpoint, stats in self._stats.items()}
+
+    def close(self):
+        self.session.close()
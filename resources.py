@@ -0,0 +1,119 @@
+"""Recursos pesados compartidos por todas las sesiones y reruns del proceso.
+
+Streamlit vuelve a ejecutar app.py en cada interacción, pero los módulos importados
+se conservan; por eso los modelos se guardan aquí y se cargan una sola vez por
+proceso. Cada recurso tiene su propio candado, así que dos sesiones que arrancan
+a la vez esperan a la misma carga en lugar de repetirla.
+"""
+import os
+import threading
+import time
+
+_loaders = {}
+_startup = []
+_resources = {}
+_load_seconds = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+def register_resource(name, loader, startup=True):
+    """Registra la función que crea un recurso (no lo carga todavía).
+
+    Los recursos con `startup=False` no se cargan en warm_up(), solo cuando se piden.
+    """
+    with _registry_lock:
+        _loaders[name] = loader
+        _locks.setdefault(name, threading.Lock())
+        if startup and name not in _startup:
+            _startup.append(name)
+
+def get_resource(name):
+    """Devuelve el recurso, cargándolo la primera vez que se pide en el proceso"""
+    if name in _resources:
+        return _resources[name]
+    if name not in _loaders:
+        raise KeyError(f"Recurso no registrado: {name}")
+    with _locks[name]:
+        if name not in _resources:
+            start = time.perf_counter()
+            _resources[name] = _loaders[name]()
+            _load_seconds[name] = time.perf_counter() - start
+            print(f"Recurso '{name}' cargado en {_load_seconds[name]:.2f} s")
+    return _resources[name]
+
+def warm_up(names=None):
+    """Carga los recursos indicados (los de arranque por defecto) y devuelve su tiempo de carga"""
+    for name in names or list(_startup):
+        get_resource(name)
+    return resource_load_times()
+
+def resource_load_times():
+    """Segundos que tardó en cargarse cada recurso ya cargado"""
+    return dict(_load_seconds)
+
+def _load_nlp():
+    import spacy
+    return spacy.load("es_core_news_sm")
+
+def _load_query_tokenizer():
+    # Solo el tokenizador: las consultas no necesitan el tagger, el parser ni el NER.
+    # Con QUERY_TOKENIZER=pipeline se usa el tokenizador de es_core_news_sm
+    if os.getenv("QUERY_TOKENIZER", "blank") == "pipeline":
+        return get_resource("nlp").tokenizer
+    import spacy
+    return spacy.blank("es").tokenizer
+
+def _load_translation_model():
+    from translator import load_model
+    return load_model()
+
+def _load_translation_cache():
+    from translation_cache import open_translation_cache
+    return open_translation_cache()
+
+def _load_rawg_client():
+    from rawg_client import RAWGClient
+    return RAWGClient(os.getenv("RAWG_API_KEY"))
+
+def _load_rawg_lookup():
+    from rawg_cache import CachedGameLookup, RAWGResponseCache
+    return CachedGameLookup(get_resource("rawg_client"), RAWGResponseCache())
+
+def _load_ocr_client():
+    from ocr_cache import OCRResultCache
+    from ocr_client import OCRSpaceClient
+    api_keys = [key.strip() for key in os.getenv("OCR_API_KEYS", "").split(",") if key.strip()]
+    return OCRSpaceClient(api_keys, cache=OCRResultCache())
+
+def _load_game_store():
+    from game_store import GameStore
+    return GameStore()
+
+def _load_recommender():
+    from catalog_index import create_recommender
+    return create_recommender()
+
+def _load_trace_exporter():
+    # Solo con las trazas activadas (TRACING=1) y un archivo de destino (TRACE_EXPORT_PATH)
+    import tracing
+    if not (tracing.tracer.enabled and tracing.TRACE_EXPORT_PATH):
+        return None
+    return tracing.start_exporter()
+
+def _load_title_index():
+    from title_search import TitleIndex
+    # Solo los juegos que vinieron de RAWG (las filas antiguas del CSV no tienen id ni datos completos)
+    games = get_resource("game_store").iter_games()
+    return TitleIndex.from_games(game for game in games if game.get("id") is not None)
+
+register_resource("nlp", _load_nlp, startup=False)
+register_resource("query_tokenizer", _load_query_tokenizer)
+register_resource("translation_model", _load_translation_model)
+register_resource("translation_cache", _load_translation_cache)
+register_resource("rawg_client", _load_rawg_client)
+register_resource("rawg_lookup", _load_rawg_lookup)
+register_resource("ocr_client", _load_ocr_client)
+register_resource("game_store", _load_game_store)
+register_resource("title_index", _load_title_index)
+register_resource("recommender", _load_recommender)
+register_resource("trace_exporter", _load_trace_exporter)
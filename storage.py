@@ -0,0 +1,36 @@
+"""Utilidades compartidas por los almacenes y cachés locales.
+
+`ThreadLocalConnection` abre una conexión SQLite por hilo (las conexiones no se
+comparten entre hilos) en modo WAL: las lecturas no bloquean a quien escribe y
+varios procesos pueden usar el mismo archivo. `game_rating` normaliza la
+valoración de un juego para los índices y el almacén.
+"""
+import os
+import sqlite3
+import threading
+
+class ThreadLocalConnection:
+    """Llamable que devuelve la conexión del hilo actual a `path` (la crea la primera vez)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+def game_rating(game):
+    """Valoración del juego como float (0.0 si falta o no es numérica)"""
+    try:
+        return float(game.get("rating") or 0)
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,206 @@
+"""Búsqueda local de títulos tolerante a errores de escritura.
+
+Cada título se normaliza (minúsculas, sin acentos ni signos) y se indexa por sus
+trigramas de caracteres. Una consulta puntúa todos los títulos con BM25 sobre
+los trigramas en una sola pasada (np.bincount sobre las listas de la consulta),
+y los mejores candidatos se reordenan por la distancia de edición con la
+consulta (Levenshtein bit a bit). La confianza es 1 - distancia / longitud: con
+una confianza alta no hace falta preguntar a RAWG.
+
+Los números de entrega ("4", "iv", "2077") no se tratan como errores de
+escritura: un título solo se acepta sin RAWG si tiene los mismos que la consulta
+("far cry 5" no es "Far Cry 4", pero "grand theft auto v" sí es "Grand Theft Auto 5").
+"""
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+
+LOCAL_MATCH_CONFIDENCE = float(os.getenv("LOCAL_MATCH_CONFIDENCE", "0.85"))
+CANDIDATES = 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def normalize_title(title):
+    """Minúsculas, sin acentos y con los signos convertidos en espacios"""
+    title = unicodedata.normalize("NFKD", title.lower())
+    title = "".join(char for char in title if not unicodedata.combining(char))
+    return " ".join(re.sub(r"[^0-9a-zñ]+", " ", title).split())
+
+ROMAN_NUMERAL = re.compile(r"^(x{0,3})(ix|iv|v?i{0,3})$")
+ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+
+def _roman_value(token):
+    total = 0
+    for char, following in zip(token, token[1:] + " "):
+        value = ROMAN_VALUES[char]
+        total += -value if ROMAN_VALUES.get(following, 0) > value else value
+    return total
+
+def sequel_numbers(normalized):
+    """Números de un título normalizado (arábigos o romanos hasta XXXIX), en orden"""
+    numbers = []
+    for token in normalized.split():
+        if token.isdigit():
+            numbers.append(int(token))
+        elif ROMAN_NUMERAL.match(token):
+            numbers.append(_roman_value(token))
+    return numbers
+
+def trigrams(normalized):
+    padded = f"  {normalized} "
+    return Counter(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def levenshtein(a, b):
+    """Distancia de edición con el algoritmo bit a bit de Myers (un entero como vector de bits)"""
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(b)
+    if m == 0:
+        return len(a)
+    peq = {}
+    for i, char in enumerate(b):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for char in a:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh = mh << 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+def similarity(a, b):
+    longest = max(len(a), len(b))
+    return 1.0 - levenshtein(a, b) / longest if longest else 1.0
+
+class TitleIndex:
+    def __init__(self):
+        self.titles = []
+        self.normalized = []
+        self.ids = []
+        self.ratings = []
+        self._positions = {}
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._total_length = 0
+        self._docs_by_gram = defaultdict(list)
+        # Listas en arrays (documentos, frecuencias), creadas al consultarlas
+        self._postings = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.titles)
+
+    @classmethod
+    def from_games(cls, games):
+        index = cls()
+        for game in games:
+            index.add(game)
+        # Todas las listas en arrays de una vez, para que ninguna consulta pague su creación
+        for gram in index._docs_by_gram:
+            index._posting(gram)
+        return index
+
+    def add(self, game):
+        """Indexa el título de un juego (si ya estaba, actualiza su id y rating)"""
+        normalized = normalize_title(game.get("name") or "")
+        if not normalized:
+            return
+        key = game.get("id") if game.get("id") is not None else normalized
+        with self._lock:
+            if key in self._positions:
+                doc = self._positions[key]
+                self.titles[doc] = game["name"]
+                self.ratings[doc] = float(game.get("rating") or 0)
+                return
+            doc = len(self.titles)
+            self._positions[key] = doc
+            self.titles.append(game["name"])
+            self.normalized.append(normalized)
+            self.ids.append(game.get("id"))
+            self.ratings.append(float(game.get("rating") or 0))
+            grams = trigrams(normalized)
+            if doc >= len(self._lengths):
+                grown = np.zeros(max(doc + 1, len(self._lengths) * 2, 16), dtype=np.float32)
+                grown[:len(self._lengths)] = self._lengths
+                self._lengths = grown
+            self._lengths[doc] = sum(grams.values())
+            self._total_length += self._lengths[doc]
+            for gram, count in grams.items():
+                self._docs_by_gram[gram].extend([doc] * count)
+                self._postings.pop(gram, None)
+
+    def _posting(self, gram):
+        if gram not in self._postings:
+            docs, counts = np.unique(np.asarray(self._docs_by_gram[gram], dtype=np.int64), return_counts=True)
+            self._postings[gram] = (docs, counts.astype(np.float32))
+        return self._postings[gram]
+
+    def _bm25(self, grams):
+        """Puntuación BM25 de todos los títulos para los trigramas de la consulta"""
+        n = len(self.titles)
+        average_length = self._total_length / n
+        all_docs, all_weights = [], []
+        for gram, query_count in grams.items():
+            if gram not in self._docs_by_gram:
+                continue
+            docs, counts = self._posting(gram)
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            lengths = self._lengths[docs] / average_length
+            all_docs.append(docs)
+            all_weights.append(
+                query_count * idf * counts * (BM25_K1 + 1) / (counts + BM25_K1 * (1 - BM25_B + BM25_B * lengths))
+            )
+        if not all_docs:
+            return None
+        return np.bincount(np.concatenate(all_docs), weights=np.concatenate(all_weights), minlength=n)
+
+    def search(self, query, limit=5):
+        """Mejores títulos para la consulta (id, name, confidence, score, rating), de mayor a menor confianza"""
+        normalized = normalize_title(query)
+        if not normalized:
+            return []
+        with self._lock:
+            if not self.titles:
+                return []
+            scores = self._bm25(trigrams(normalized))
+            if scores is None:
+                return []
+            k = min(CANDIDATES, len(scores))
+            candidates = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+            matches = [
+                {
+                    "id": self.ids[doc],
+                    "name": self.titles[doc],
+                    "confidence": similarity(normalized, self.normalized[doc]),
+                    "score": float(scores[doc]),
+                    "rating": self.ratings[doc]
+                }
+                for doc in candidates.tolist() if scores[doc] > 0
+            ]
+        matches.sort(key=lambda match: (match["confidence"], match["score"], match["rating"]), reverse=True)
+        return matches[:limit]
+
+    def best_match(self, query, min_confidence=LOCAL_MATCH_CONFIDENCE):
+        """Mejor título con los mismos números que la consulta si su confianza llega al mínimo (None si no)"""
+        numbers = sequel_numbers(normalize_title(query))
+        for match in self.search(query, limit=CANDIDATES):
+            if match["confidence"] < min_confidence:
+                return None
+            if sequel_numbers(normalize_title(match["name"])) == numbers:
+                return match
+        return None
@@ -0,0 +1,290 @@
+"""Caché de traducciones con escrituras incrementales y seguras entre sesiones y procesos.
+
+Las claves son el hash SHA-256 del texto original, así que su tamaño no depende
+de la longitud de la descripción. Cada variante de traducción (perfil de
+decodificación y modelo fp32 o int8) tiene sus propias claves (ver ScopedTranslationCache). El caché se usa a nivel de párrafo para que
+los textos repetidos entre descripciones (avisos legales, requisitos, etc.) se
+traduzcan una sola vez; el tamaño está acotado y se expulsan primero las
+entradas usadas hace más tiempo (LRU).
+
+Backends disponibles (variable de entorno TRANSLATION_CACHE_BACKEND):
+    - sqlite: archivo cache/translations.sqlite3 compartido por todos los procesos
+    - memory: diccionario en memoria del proceso (sin persistencia)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from storage import ThreadLocalConnection
+
+TRANSLATION_CACHE_PATH = "cache/translations.sqlite3"
+LEGACY_JSON_PATH = "cache/translations.json"
+DEFAULT_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+
+# Variante con la que se hicieron las traducciones ya guardadas y las del JSON antiguo
+# (beam search con el modelo fp32); sus claves no llevan prefijo
+DEFAULT_VARIANT = "quality/fp32"
+# Variantes de calidad, de mejor a peor: se usan cuando falta la de una variante inferior
+QUALITY_VARIANTS = [DEFAULT_VARIANT, "quality/int8"]
+
+def hash_key(text):
+    """Clave de caché de un texto original"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def legacy_pairs(cache):
+    """Pares (original, traducción) de un caché JSON antiguo, también por párrafo.
+
+    Las traducciones conservan los saltos de línea del original, así que cuando
+    ambos tienen el mismo número de líneas se emparejan párrafo a párrafo.
+    """
+    for text, translation in cache.items():
+        if not isinstance(text, str) or not isinstance(translation, str):
+            continue
+        yield text, translation
+        paragraphs = text.split('\n')
+        translated_paragraphs = translation.split('\n')
+        if len(paragraphs) > 1 and len(paragraphs) == len(translated_paragraphs):
+            for paragraph, translated in zip(paragraphs, translated_paragraphs):
+                if paragraph.strip() and translated.strip():
+                    yield paragraph.strip(), translated.strip()
+
+class MemoryTranslationCache:
+    """Caché LRU en memoria del proceso"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, texts):
+        """Traducciones guardadas de los textos indicados (solo los aciertos)"""
+        found = {}
+        with self._lock:
+            for text in texts:
+                key = hash_key(text)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[text] = self._entries[key]
+        return found
+
+    def set_many(self, translations):
+        """Guarda varias traducciones {original: traducción}"""
+        with self._lock:
+            for text, translation in translations.items():
+                key = hash_key(text)
+                self._entries[key] = translation
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, text):
+        return self.get_many([text]).get(text)
+
+    def set(self, text, translation):
+        self.set_many({text: translation})
+
+    def import_json(self, path=LEGACY_JSON_PATH):
+        """Importa un archivo translations.json antiguo; devuelve cuántas entradas se leyeron"""
+        cache = _read_legacy_json(path)
+        self.set_many(dict(legacy_pairs(cache)))
+        return len(cache)
+
+class SQLiteTranslationCache:
+    """Caché LRU persistente en SQLite.
+
+    Cada escritura es una transacción que solo toca las filas nuevas (sin reescribir
+    el archivo), el modo WAL permite lecturas concurrentes mientras otro proceso
+    escribe y cada hilo usa su propia conexión.
+    """
+
+    def __init__(self, path=TRANSLATION_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 legacy_json=LEGACY_JSON_PATH):
+        self.path = path
+        self.max_entries = max_entries
+        self._connection = ThreadLocalConnection(path)
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " key TEXT PRIMARY KEY,"
+                " translation TEXT NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        if legacy_json:
+            self._import_legacy_once(legacy_json)
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def get_many(self, texts):
+        """Traducciones guardadas de los textos indicados (solo los aciertos)"""
+        keys = {hash_key(text): text for text in texts}
+        if not keys:
+            return {}
+        conn = self._connection()
+        found = {}
+        key_list = list(keys)
+        # SQLite limita el número de parámetros por consulta
+        for start in range(0, len(key_list), 500):
+            chunk = key_list[start:start + 500]
+            rows = conn.execute(
+                f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for key, translation in rows:
+                found[keys[key]] = translation
+        if found:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE key = ?",
+                    [(now, hash_key(text)) for text in found]
+                )
+        return found
+
+    def set_many(self, translations):
+        """Guarda varias traducciones {original: traducción} en una sola transacción"""
+        if not translations:
+            return
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                [(hash_key(text), translation, now) for text, translation in translations.items()]
+            )
+            self._evict(conn)
+
+    def _evict(self, conn):
+        """Borra las entradas usadas hace más tiempo si se supera el límite"""
+        excess = conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                " SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def get(self, text):
+        return self.get_many([text]).get(text)
+
+    def set(self, text, translation):
+        self.set_many({text: translation})
+
+    def _insert_legacy(self, conn, cache):
+        # Las entradas existentes tienen prioridad sobre las importadas
+        now = time.time()
+        conn.executemany(
+            "INSERT OR IGNORE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+            [(hash_key(text), translation, now) for text, translation in legacy_pairs(cache)]
+        )
+        self._evict(conn)
+
+    def import_json(self, path=LEGACY_JSON_PATH):
+        """Importa un archivo translations.json antiguo; devuelve cuántas entradas se leyeron"""
+        cache = _read_legacy_json(path)
+        conn = self._connection()
+        with conn:
+            self._insert_legacy(conn, cache)
+        return len(cache)
+
+    def _import_legacy_once(self, path):
+        """Importa el JSON antiguo la primera vez que se abre el caché"""
+        if not os.path.isfile(path):
+            return
+        conn = self._connection()
+        with conn:
+            # La marca y la importación van en la misma transacción; si otro
+            # proceso ya la hizo, el INSERT no agrega nada y no se repite
+            claimed = conn.execute(
+                "INSERT OR IGNORE INTO meta (name, value) VALUES ('legacy_json_imported', ?)",
+                (path,)
+            ).rowcount
+            if claimed:
+                cache = _read_legacy_json(path)
+                self._insert_legacy(conn, cache)
+        if claimed:
+            print(f"Caché de traducciones: importadas {len(cache)} entradas de {path}")
+
+def _read_legacy_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error al leer el caché {path}: {e}")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _variant_prefix(variant):
+    return "" if variant == DEFAULT_VARIANT else f"[{variant}]\0"
+
+def fallback_variants(variant):
+    """Variantes mejores que `variant` cuyas traducciones también le sirven"""
+    if variant in QUALITY_VARIANTS:
+        return QUALITY_VARIANTS[:QUALITY_VARIANTS.index(variant)]
+    return list(QUALITY_VARIANTS)
+
+class ScopedTranslationCache:
+    """Vista de un caché en la que las claves llevan la variante de traducción.
+
+    Una traducción rápida (voraz y con longitud limitada) o del modelo int8 nunca
+    se devuelve a quien pide la de calidad. Al revés sí: si falta la rápida se usa
+    la de calidad que haya (p. ej. la precalculada por ingest.py).
+    """
+
+    def __init__(self, cache, variant):
+        self.cache = cache
+        self.variant = variant
+        self._prefix = _variant_prefix(variant)
+        self._fallback_prefixes = [_variant_prefix(fallback) for fallback in fallback_variants(variant)]
+
+    def _lookup(self, prefix, texts):
+        if not prefix:
+            return self.cache.get_many(texts)
+        found = self.cache.get_many([prefix + text for text in texts])
+        return {text[len(prefix):]: translation for text, translation in found.items()}
+
+    def get_many(self, texts):
+        found = self._lookup(self._prefix, texts)
+        for prefix in self._fallback_prefixes:
+            missing = [text for text in texts if text not in found]
+            if not missing:
+                break
+            found.update(self._lookup(prefix, missing))
+        return found
+
+    def set_many(self, translations):
+        self.cache.set_many({self._prefix + text: translation for text, translation in translations.items()})
+
+    def get(self, text):
+        return self.get_many([text]).get(text)
+
+    def set(self, text, translation):
+        self.set_many({text: translation})
+
+def scoped_cache(cache, variant):
+    """El caché con las claves de `variant` (None si no hay caché)"""
+    if cache is None:
+        return None
+    if isinstance(cache, ScopedTranslationCache):
+        cache = cache.cache
+    return ScopedTranslationCache(cache, variant)
+
+TRANSLATION_CACHE_BACKENDS = {
+    "sqlite": SQLiteTranslationCache,
+    "memory": MemoryTranslationCache,
+}
+
+def open_translation_cache(backend=None, **options):
+    """Crea el caché de traducciones del backend configurado"""
+    backend = backend or os.getenv("TRANSLATION_CACHE_BACKEND", "sqlite")
+    if backend not in TRANSLATION_CACHE_BACKENDS:
+        raise ValueError(f"Backend de caché de traducciones desconocido: {backend}")
+    return TRANSLATION_CACHE_BACKENDS[backend](**options)
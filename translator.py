@@ -0,0 +1,261 @@
+"""Traducción inglés -> español con MarianMT por lotes."""
+import json
+import os
+import re
+
+import torch
+import transformers
+from transformers import MarianMTModel, MarianTokenizer
+
+from tracing import span
+from translation_cache import scoped_cache
+
+# Configurar el modelo de traducción MarianMT
+model_name = "Helsinki-NLP/opus-mt-en-es"
+model_path = "models/marianmt"
+
+# Tamaño máximo de lote para model.generate (configurable por variable de entorno)
+MAX_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "8"))
+
+# Modo de inferencia cuantizado (capas lineales en int8) para servidores solo con CPU
+QUANTIZED = os.getenv("TRANSLATION_QUANTIZED", "0") == "1"
+quantized_model_path = "models/marianmt-int8"
+
+# Perfiles de decodificación para model.generate:
+#   - fast: búsqueda voraz con un límite de salida proporcional a la entrada (consultas interactivas)
+#   - quality: la configuración de generation_config.json del modelo (beam search; traducción offline)
+DECODING_PROFILES = {
+    "fast": {"num_beams": 1, "do_sample": False, "length_ratio": 1.5, "length_margin": 10},
+    "quality": {},
+}
+DEFAULT_PROFILE = "quality"
+
+# Los párrafos más largos que esto se dividen en fragmentos por oraciones
+MAX_CHUNK_CHARS = 600
+
+def load_fp32_model():
+    """Cargar o descargar el modelo MarianMT."""
+    try:
+        # Intentar cargar el modelo localmente
+        tokenizer = MarianTokenizer.from_pretrained(model_path)
+        model = MarianMTModel.from_pretrained(model_path)
+        return tokenizer, model
+    except:
+        # Si no existe localmente, descargarlo y guardarlo
+        tokenizer = MarianTokenizer.from_pretrained(model_name)
+        model = MarianMTModel.from_pretrained(model_name)
+
+        # Guardar el modelo y el tokenizador
+        tokenizer.save_pretrained(model_path)
+        model.save_pretrained(model_path)
+
+        return tokenizer, model
+
+def quantize_model(model):
+    """Cuantización dinámica a int8 de las capas lineales (solo inferencia en CPU)"""
+    model.eval()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    quantized.cache_variant = "int8"
+    return quantized
+
+def _artifact_versions():
+    """Versiones con las que se generó el modelo cuantizado; si cambian hay que regenerarlo"""
+    weights = os.path.join(model_path, "model.safetensors")
+    return {
+        "torch": torch.__version__,
+        "transformers": transformers.__version__,
+        "source_mtime": os.path.getmtime(weights) if os.path.isfile(weights) else None
+    }
+
+def load_quantized_model(path=quantized_model_path):
+    """Cargar el modelo cuantizado guardado en disco o generarlo y guardarlo la primera vez."""
+    model_file = os.path.join(path, "model.pt")
+    versions_file = os.path.join(path, "versions.json")
+    try:
+        with open(versions_file, 'r', encoding='utf-8') as f:
+            if json.load(f) == _artifact_versions():
+                tokenizer = MarianTokenizer.from_pretrained(path)
+                # El archivo lo genera esta misma función, no viene de fuentes externas
+                model = torch.load(model_file, weights_only=False)
+                model.eval()
+                model.cache_variant = "int8"
+                return tokenizer, model
+    except (OSError, ValueError, RuntimeError, AttributeError) as e:
+        print(f"No se pudo cargar el modelo cuantizado, se vuelve a generar: {e}")
+
+    tokenizer, model = load_fp32_model()
+    model = quantize_model(model)
+
+    # Guardar el modelo cuantizado; versions.json se escribe al final porque es
+    # el que indica que el artefacto está completo
+    os.makedirs(path, exist_ok=True)
+    tokenizer.save_pretrained(path)
+    torch.save(model, f"{model_file}.tmp")
+    os.replace(f"{model_file}.tmp", model_file)
+    with open(versions_file, 'w', encoding='utf-8') as f:
+        json.dump(_artifact_versions(), f)
+
+    return tokenizer, model
+
+def load_model(quantized=None):
+    """Cargar el modelo MarianMT en fp32 o, si está configurado, cuantizado a int8."""
+    if quantized is None:
+        quantized = QUANTIZED
+    if quantized:
+        return load_quantized_model()
+    return load_fp32_model()
+
+def generation_options(profile, input_length):
+    """Argumentos de model.generate para un perfil y una longitud de entrada en tokens"""
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Perfil de decodificación desconocido: {profile}")
+    options = dict(DECODING_PROFILES[profile])
+    length_ratio = options.pop("length_ratio", None)
+    length_margin = options.pop("length_margin", 0)
+    if length_ratio is not None:
+        options["max_new_tokens"] = int(input_length * length_ratio) + length_margin
+    return options
+
+def translation_cache_for(cache, model, profile=DEFAULT_PROFILE):
+    """Vista del caché con las claves del perfil de decodificación y del modelo (fp32 o int8)"""
+    return scoped_cache(cache, f"{profile}/{getattr(model, 'cache_variant', 'fp32')}")
+
+def split_sentences(paragraph, max_chars=MAX_CHUNK_CHARS):
+    """Divide un párrafo largo en fragmentos de oraciones completas de hasta `max_chars`"""
+    if len(paragraph) <= max_chars:
+        return [paragraph]
+    chunks = []
+    current = ""
+    for sentence in re.split(r'(?<=[.!?])\s+', paragraph):
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+def translate_segments(segments, tokenizer, model, max_batch_size=MAX_BATCH_SIZE, profile=DEFAULT_PROFILE):
+    """Traduce una lista de textos en lotes agrupados por longitud; conserva el orden"""
+    if not segments:
+        return []
+
+    # Ordenar por longitud en tokens para que cada lote tenga poco relleno
+    lengths = [len(ids) for ids in tokenizer(segments)["input_ids"]]
+    order = sorted(range(len(segments)), key=lambda i: lengths[i])
+
+    translations = [None] * len(segments)
+    with span("translate.marianmt"), torch.inference_mode():
+        for start in range(0, len(order), max_batch_size):
+            batch = order[start:start + max_batch_size]
+            inputs = tokenizer(
+                [segments[i] for i in batch],
+                return_tensors="pt",
+                padding=True,
+                truncation=True
+            )
+            generated = model.generate(**inputs, **generation_options(profile, inputs["input_ids"].shape[1]))
+            decoded = tokenizer.batch_decode(generated, skip_special_tokens=True)
+            for i, text in zip(batch, decoded):
+                translations[i] = text
+    return translations
+
+def _cached_paragraphs(paragraphs, cache):
+    """Traducciones ya guardadas y párrafos pendientes {párrafo: [posiciones]}"""
+    translated_paragraphs = [''] * len(paragraphs)  # Mantener los saltos de línea vacíos
+    pending = {}
+    for index, paragraph in enumerate(paragraphs):
+        if paragraph.strip():  # Solo traducir si el párrafo no está vacío
+            pending.setdefault(paragraph.strip(), []).append(index)
+    cached = cache.get_many(list(pending)) if cache is not None else {}
+    for paragraph, translation in cached.items():
+        for index in pending.pop(paragraph):
+            translated_paragraphs[index] = translation
+    return translated_paragraphs, pending
+
+def _translate_new_paragraphs(paragraphs, tokenizer, model, max_batch_size, cache, profile):
+    """Traduce párrafos (divididos en fragmentos si son largos) y guarda el resultado en caché"""
+    # Fragmentos a traducir y el párrafo al que pertenece cada uno
+    segments = []
+    owners = []
+    for paragraph in paragraphs:
+        for chunk in split_sentences(paragraph):
+            segments.append(chunk)
+            owners.append(paragraph)
+
+    new_translations = {}
+    for paragraph, translation in zip(owners, translate_segments(segments, tokenizer, model, max_batch_size, profile)):
+        if paragraph in new_translations:
+            new_translations[paragraph] += f" {translation}"
+        else:
+            new_translations[paragraph] = translation
+    if cache is not None and new_translations:
+        cache.set_many(new_translations)
+    return new_translations
+
+def translate_paragraphs(text, tokenizer, model, max_batch_size=MAX_BATCH_SIZE, cache=None,
+                         profile=DEFAULT_PROFILE):
+    """Traduce un texto por párrafos en lotes y vuelve a colocar las líneas vacías.
+
+    Si se pasa un `cache` (ver translation_cache.py) los párrafos ya traducidos
+    se toman de él y solo los nuevos pasan por el modelo y se guardan. `profile`
+    elige el perfil de decodificación (ver DECODING_PROFILES).
+    """
+    return translate_texts([text], tokenizer, model, max_batch_size, cache, profile)[0]
+
+def translate_texts(texts, tokenizer, model, max_batch_size=MAX_BATCH_SIZE, cache=None,
+                    profile=DEFAULT_PROFILE):
+    """Traduce varios textos juntos: los párrafos de todos comparten los mismos lotes.
+
+    Los párrafos repetidos entre textos se traducen una sola vez.
+    """
+    cache = translation_cache_for(cache, model, profile)
+    results = []
+    pending = {}
+    for text_index, text in enumerate(texts):
+        translated_paragraphs, text_pending = _cached_paragraphs(text.split('\n'), cache)
+        results.append(translated_paragraphs)
+        for paragraph, indexes in text_pending.items():
+            pending.setdefault(paragraph, []).extend((text_index, index) for index in indexes)
+
+    new_translations = _translate_new_paragraphs(list(pending), tokenizer, model, max_batch_size, cache, profile)
+    for paragraph, translation in new_translations.items():
+        for text_index, index in pending[paragraph]:
+            results[text_index][index] = translation
+
+    # Unir los párrafos traducidos con saltos de línea
+    return ['\n'.join(translated_paragraphs) for translated_paragraphs in results]
+
+def iter_translated_paragraphs(text, tokenizer, model, max_batch_size=MAX_BATCH_SIZE, cache=None,
+                               profile=DEFAULT_PROFILE):
+    """Generador que entrega, en orden, la traducción de cada línea del texto.
+
+    Traduce en el orden del documento: el primer lote es de un solo párrafo para
+    que el primer texto aparezca cuanto antes y los siguientes usan `max_batch_size`.
+    Unir lo entregado con saltos de línea da el mismo resultado que translate_paragraphs.
+    """
+    cache = translation_cache_for(cache, model, profile)
+    paragraphs = text.split('\n')
+    translated_paragraphs, pending = _cached_paragraphs(paragraphs, cache)
+
+    pending_indexes = {index for indexes in pending.values() for index in indexes}
+    done = [index not in pending_indexes for index in range(len(paragraphs))]
+    to_translate = list(pending)
+    next_index = 0
+    batch_size = 1
+    while True:
+        # Entregar todas las líneas consecutivas que ya están listas
+        while next_index < len(paragraphs) and done[next_index]:
+            yield translated_paragraphs[next_index]
+            next_index += 1
+        if not to_translate:
+            break
+
+        batch, to_translate = to_translate[:batch_size], to_translate[batch_size:]
+        batch_size = max_batch_size
+        new_translations = _translate_new_paragraphs(batch, tokenizer, model, max_batch_size, cache, profile)
+        for paragraph, translation in new_translations.items():
+            for index in pending[paragraph]:
+                translated_paragraphs[index] = translation
+                done[index] = True